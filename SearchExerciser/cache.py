@@ -0,0 +1,144 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+
+
+class ResultCache:
+    # class that implements a least-recently-used (LRU) cache for search results
+    # usage:
+    #   cache = ResultCache(max_size=1000, filename="results.pkl")
+    #   path = maze.search(AS, cache=cache)  # searches and stores result
+    #   path = maze.search(AS, cache=cache)  # returns stored result without instantiating AS
+    # the key is a hash of the problem content (see state_space.Problem.fingerprint),
+    # the algorithm class and its parameters (except print_result and print_queue)
+    # a result consists of the path to goal (as state keys, see state_space.State.key) and the search metrics
+
+    def __init__(self, max_size=128, filename=None):
+        # max_size is the maximum number of results in cache (int), default is 128
+        #   if max_size is exceeded, the least recently used result is removed
+        # filename is the file the cache is stored in (string), default is None (no persistence)
+        #   if the file exists, the stored results are loaded
+        #   the file is updated each time a new result is added
+        self.max_size = max_size
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()  # {key: dictionary with result}
+        if filename is not None and os.path.exists(filename):
+            self.load()
+
+    def search(self, problem, Method, **kwargs):
+        # searches path from start to goal if the result is not in cache
+        # the result is not stored if the search budget is exhausted (see search.base.Algorithm)
+        # problem is a state_space.Problem object
+        # Method and kwargs: see method state_space.Problem.search
+        # returns the path to goal (Path object or None)
+        key = self.key(problem, Method, **kwargs)
+        result = self.get(key)
+        if result is None:
+            self.misses += 1
+            method = problem.create_algorithm(Method, **kwargs)
+            method.search()
+            path = method.path_to_goal
+            result = dict(name=method.name,
+                          path=None if path is None else [state.key for state in path],
+                          cost=None if path is None else path.cost,
+                          goal_is_reached=method.goal_is_reached,
+                          elapsed_time=method.elapsed_time,
+                          nr_iterations=method.nr_iterations,
+                          max_queue_length=max(method.queue_lengths))
+            # a search that is stopped because its budget is exhausted (or cancelled) has no result to reuse
+            if not method.budget_exhausted:
+                self.put(key, result)
+            return path
+        self.hits += 1
+        if kwargs.get('print_result', True):
+            self._print_result(result)
+        return None if result['path'] is None else problem._get_path(result['path'], result['cost'])
+
+    def metrics(self, problem, Method, **kwargs):
+        # returns dictionary with the stored search metrics for given problem, Method and kwargs
+        # or None if the result is not in cache
+        result = self.get(self.key(problem, Method, **kwargs))
+        return None if result is None else {k: v for k, v in result.items() if k != 'path'}
+
+    @staticmethod
+    def key(problem, Method, **kwargs):
+        # returns the cache key (string) for given problem, Method and kwargs
+        # only data parameters are part of the key (see method _is_data), others such as callbacks are left out,
+        #   as their representation contains a memory address that differs every run
+        parameters = sorted((k, repr(v)) for k, v in kwargs.items()
+                            if k not in ('print_result', 'print_queue') and ResultCache._is_data(v))
+        content = (problem.fingerprint(), Method.__module__, Method.__qualname__, parameters)
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
+    @staticmethod
+    def _is_data(value):
+        # checks if given parameter value is data, i.e. it has a representation that is the same in every run
+        # returns False for functions and other callables, and for objects with the default representation
+        return not callable(value) and type(value).__repr__ is not object.__repr__
+
+    def get(self, key):
+        # returns result (dictionary) stored with given key, or None if key is not in cache
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)  # most recently used
+        return result
+
+    def put(self, key, result):
+        # stores result (dictionary) with given key
+        # removes least recently used result if the cache is full
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+        if self.filename is not None:
+            self.save()
+
+    def clear(self):
+        # removes all results
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, filename=None):
+        # saves results to given file, default is self.filename
+        # the file is replaced atomically so that a crash cannot leave a corrupt cache file
+        filename = self.filename if filename is None else filename
+        with open(filename + ".tmp", "wb") as file:
+            pickle.dump(list(self._results.items()), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(filename + ".tmp", filename)
+
+    def load(self, filename=None):
+        # loads results from given file, default is self.filename
+        filename = self.filename if filename is None else filename
+        with open(filename, "rb") as file:
+            self._results = OrderedDict(pickle.load(file))
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    @staticmethod
+    def _print_result(result):
+        # prints stored result
+        print("ALGORITHM:", result['name'], "(cached result)")
+        print("RESULT:", "SUCCES" if result['goal_is_reached'] else "FAILURE")
+        print("Elapsed time:", result['elapsed_time'], 'seconds')
+        print('Number of iterations:', result['nr_iterations'])
+        print('Maximum length of queue:', result['max_queue_length'])
+        if result['cost'] is not None:
+            print('Accumulated cost of path to goal:', result['cost'])
+
+    def __repr__(self):
+        # overrides inherited __repr__ method
+        # returns string
+        return f"ResultCache(size={len(self)}, max_size={self.max_size}, hits={self.hits}, misses={self.misses})"
@@ -3,32 +3,150 @@
 # May 2022
 from . import state_space
 import numpy as np
-import networkx as nx
 import string
 from itertools import combinations, product
 import random
+import heapq
+import hashlib
+# networkx is imported where graphs are constructed or plotted only, as importing it takes time and memory
+
+
+class CSRGraph:
+    # class to define a compact graph in compressed sparse row (CSR) format, independent of networkx
+    # the vertices have integer ids 0, 1, ..., n-1
+    # the neighbors of the vertex with id i are neighbors[offsets[i]:offsets[i+1]],
+    #   the costs of the edges to these neighbors are costs[offsets[i]:offsets[i+1]]
+    # each undirected edge is stored twice, once for each of its vertices
+    # used by Graph to search the graph without going through the dictionaries of networkx
+
+    def __init__(self, vertices, offsets, neighbors, costs=None, heuristic=None, directed=False):
+        # vertices is list of vertices (names), the vertex vertices[i] has id i
+        # offsets and neighbors are integer numpy arrays
+        # costs is numpy array with the cost of each edge in neighbors, default is None: all costs are 1
+        #   NaN means that the edge has no cost, so its cost is 1
+        # heuristic is numpy array with the heuristic value of each vertex, default is None
+        #   NaN means that the vertex has no heuristic value
+        # directed is boolean, default is False; if True, each edge is only stored for its first vertex
+        self.vertices = list(vertices)
+        self.index = {vertex: i for i, vertex in enumerate(self.vertices)}  # {vertex: id}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.neighbors = np.asarray(neighbors, dtype=np.int64)
+        if costs is None:
+            self.costs = np.ones(len(self.neighbors))
+            self.has_cost = np.zeros(len(self.neighbors), dtype=bool)  # False if edge has no cost
+        else:
+            costs = np.asarray(costs)
+            self.has_cost = ~np.isnan(costs) if costs.dtype.kind == 'f' else np.ones(len(costs), dtype=bool)
+            self.costs = costs if self.has_cost.all() else np.where(self.has_cost, costs, 1.0)
+        self.heuristic = np.full(len(self.vertices), np.nan) if heuristic is None else np.asarray(heuristic)
+        self.directed = directed
+
+    def number_of_edges(self):
+        # returns the number of edges (int)
+        if self.directed:
+            return len(self.neighbors)
+        sources = np.repeat(np.arange(len(self.vertices)), np.diff(self.offsets))
+        return int(np.count_nonzero(sources <= self.neighbors))
+
+    def find_edge(self, i, j):
+        # returns the position of the edge from vertex id i to vertex id j in self.neighbors, or -1 if there is none
+        start, end = self.offsets.item(i), self.offsets.item(i + 1)
+        positions = np.flatnonzero(self.neighbors[start:end] == j)
+        return start + int(positions[0]) if positions.size > 0 else -1
+
+    def get_edges(self):
+        # returns arrays sources, targets, and positions in self.neighbors of the edges, each edge once
+        sources = np.repeat(np.arange(len(self.vertices)), np.diff(self.offsets))
+        positions = np.arange(len(self.neighbors)) if self.directed else np.flatnonzero(sources <= self.neighbors)
+        return sources[positions], self.neighbors[positions], positions
+
+    def to_networkx(self):
+        # returns networkx.Graph object (networkx.DiGraph object if directed)
+        # with edge attribute "cost" and vertex attribute "h"
+        import networkx as nx
+        graph = nx.DiGraph() if self.directed else nx.Graph()
+        graph.add_nodes_from(self.vertices)
+        sources, targets, positions = self.get_edges()
+        sources = [self.vertices[i] for i in sources.tolist()]
+        targets = [self.vertices[i] for i in targets.tolist()]
+        costs = [cost if has_cost else None
+                 for cost, has_cost in zip(self.costs[positions].tolist(), self.has_cost[positions].tolist())]
+        graph.add_edges_from((u, v) if cost is None else (u, v, {'cost': cost})
+                             for u, v, cost in zip(sources, targets, costs))
+        heuristic = {vertex: h for vertex, h in zip(self.vertices, self.heuristic.tolist()) if h == h}  # not NaN
+        nx.set_node_attributes(graph, heuristic, 'h')
+        return graph
+
+    @staticmethod
+    def from_networkx(graph):
+        # creates CSRGraph object from networkx.Graph object with edge attribute "cost" and vertex attribute "h"
+        vertices = list(graph.nodes)
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        offsets, neighbors, costs = [0], [], []
+        for vertex in vertices:
+            for neighbor, attributes in graph.adj[vertex].items():
+                neighbors.append(index[neighbor])
+                costs.append(attributes.get('cost', np.nan))
+            offsets.append(len(neighbors))
+        heuristic = [np.nan if h is None else h for _, h in graph.nodes(data='h')]
+        # numpy keeps integer costs and heuristic values as integers if no value is missing
+        return CSRGraph(vertices, offsets, neighbors, np.array(costs), np.array(heuristic), graph.is_directed())
 
 
 class Graph(state_space.Problem):
     # class to define graph
-    # aggregates networkx.Graph object
+    # the graph is stored as a CSRGraph object (attribute csr), which is used to search the graph
+    # a networkx.Graph object is converted into a CSRGraph object once, by method convert_graph
+    #   attribute graph is a frozen copy of the networkx.Graph object, so changing it raises networkx.NetworkXError
+    #   instead of being ignored by the search: change a copy and convert it again (e.g. by assigning it to graph)
 
     def __init__(self, graph, start="S", goal="G", rules=None):
-        # graph is a networkx.Graph object
+        # graph is a networkx.Graph object or a CSRGraph object
         #  add heuristic value as node attribute "h"
         #  add cost as edge attribute "cost"
         # start is the start node (default "S")
         # goal is the goal node (default "G")
         # rules is a list of nodes that indicates the order in which nodes are selected
         #  by default nodes are selected in alphabetic order
-        super().__init__(ProductionRule.create_all(graph) if rules is None else rules)
         self.graph = graph
+        super().__init__(ProductionRule.create_all(self.csr) if rules is None else rules)
         self.start = start
         self.goal = goal
+        self.landmarks = None  # list of landmark vertices, see method compute_landmarks
+        self.landmark_distances = None  # array with distances from each landmark (rows) to each vertex (columns)
+        self._landmark_index = None  # dictionary {vertex: column index in self.landmark_distances}
+
+    @property
+    def graph(self):
+        # returns frozen networkx.Graph object (see networkx.freeze)
+        # if the graph was created from a CSRGraph object, it is converted into a networkx.Graph object once
+        if self._graph is None:
+            import networkx as nx
+            self._graph = nx.freeze(self.csr.to_networkx())
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph):
+        # sets graph (networkx.Graph or CSRGraph object), see method convert_graph
+        self.convert_graph(graph)
+
+    def convert_graph(self, graph):
+        # converts given networkx.Graph object into a CSRGraph object (attribute csr), which is used to search the graph
+        # attribute graph becomes a frozen copy of the networkx.Graph object,
+        #   so that it always has the same vertices, edges, costs and heuristic values as the CSRGraph object
+        #   call this method again to search the graph after the networkx.Graph object is changed
+        # a CSRGraph object is used as it is, it is converted into a networkx.Graph object when needed
+        if isinstance(graph, CSRGraph):
+            self._graph, self.csr = None, graph
+        else:
+            import networkx as nx
+            self._graph, self.csr = nx.freeze(graph.copy()), CSRGraph.from_networkx(graph)
+        self._clear_compiled_rules()
 
     @property
     def vertices(self):
-        # returns self.graph.nodes
+        # returns self.graph.nodes (networkx.NodeView object)
+        # use self.csr.vertices (list) to get the vertices without converting the graph into a networkx.Graph object
         return self.graph.nodes
 
     @property
@@ -41,23 +159,227 @@ class Graph(state_space.Problem):
         initial_path = Path([initial_state])
         return PathSeries([initial_path])
 
+    def _get_path(self, keys, cost=0.0):
+        # creates Path object from given vertices and accumulated cost
+        return Path([State(self, vertex) for vertex in keys], cost)
+
+    def fingerprint(self):
+        # returns hash (string) of the edges with their costs, the heuristic values,
+        # the start and goal vertex, the order of the production rules, and the landmarks
+        vertices = self.csr.vertices
+        sources, targets, positions = self.csr.get_edges()
+        edges = sorted(sorted([str(vertices[u]), str(vertices[v])]) + [float(cost)]
+                       for u, v, cost in zip(sources.tolist(), targets.tolist(), self.csr.costs[positions].tolist()))
+        heuristic = sorted((str(vertex), None if h != h else float(h))  # NaN: no heuristic value
+                           for vertex, h in zip(vertices, self.csr.heuristic.tolist()))
+        content = (edges, heuristic, self.start, self.goal, self.rules, self.landmarks)
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
     def distance_to_goal(self, vertex):
         # returns distance from given vertex to goal
         # which is the vertex' attribute "h"
-        return self.graph.nodes[vertex]['h']
+        # if landmarks are computed, the ALT heuristic is returned instead (see method landmark_distance)
+        if self.landmarks is not None:
+            return self.landmark_distance(vertex)
+        h = self.csr.heuristic.item(self.csr.index[vertex])
+        if h != h:  # NaN
+            raise KeyError('h')
+        return h
+
+    def compute_landmarks(self, num_of_landmarks=4, landmarks=None, seed=None):
+        # computes the landmark distance table required by the ALT heuristic
+        # num_of_landmarks is the number of landmarks to select (int), default is 4
+        # landmarks is a list of vertices to use as landmarks, default is None
+        #   if landmarks is None, they are selected using farthest-point selection:
+        #   starting from a random vertex, each new landmark is the vertex farthest from the landmarks selected so far
+        # seed is random seed to select the first vertex (int)
+        # the vertices are taken from the CSRGraph object, so a graph created from it is not converted into networkx
+        vertices = sorted(self.csr.vertices, key=str)  # fixed order makes the selection reproducible
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        if landmarks is None:
+            landmarks, distances = [], []
+            vertex = random.Random(seed).choice(vertices)
+            nearest = self._dijkstra_array(vertex, index)  # distance from each vertex to the nearest landmark
+            for _ in range(min(num_of_landmarks, len(vertices))):
+                vertex = vertices[int(np.argmax(nearest))]  # unreachable vertices come first
+                if vertex in landmarks:
+                    break
+                landmarks.append(vertex)
+                distances.append(self._dijkstra_array(vertex, index))
+                nearest = np.minimum(nearest, distances[-1]) if len(landmarks) > 1 else distances[-1]
+        else:
+            landmarks = list(landmarks)
+            distances = [self._dijkstra_array(vertex, index) for vertex in landmarks]
+        self.landmarks = landmarks
+        self.landmark_distances = np.array(distances)
+        self._landmark_index = index
+
+    def landmark_distance(self, vertex, goal=None):
+        # returns the ALT heuristic: a lower bound of the distance from given vertex to goal
+        # based on the triangle inequality |d(L, goal) - d(L, vertex)| <= d(vertex, goal) for each landmark L
+        # goal is the goal vertex, default is self.goal
+        # the heuristic is admissible and consistent for any goal, provided costs are non-negative
+        # returns float (infinity if vertex and goal are not connected)
+        i = self._landmark_index[vertex]
+        j = self._landmark_index[self.goal if goal is None else goal]
+        di, dj = self.landmark_distances[:, i], self.landmark_distances[:, j]
+        if np.any(np.isinf(di) != np.isinf(dj)):
+            return np.inf  # vertex and goal are in different components
+        finite = np.isfinite(di)
+        return float(np.max(np.abs(dj[finite] - di[finite]), initial=0.0))
+
+    def save_landmarks(self, filename):
+        # saves the landmarks and their distance table to given file (numpy .npz format)
+        # so they only have to be computed once per graph
+        vertices = [None] * len(self._landmark_index)
+        for vertex, i in self._landmark_index.items():
+            vertices[i] = vertex
+        np.savez(filename,
+                 vertices=Graph._vertex_array(vertices),
+                 landmarks=np.array([self._landmark_index[vertex] for vertex in self.landmarks]),
+                 distances=self.landmark_distances)
+
+    def load_landmarks(self, filename):
+        # loads the landmarks and their distance table from given file created with method save_landmarks
+        # the file may contain pickled vertices (see method _vertex_array), so only load files you trust
+        with np.load(filename, allow_pickle=True) as data:
+            vertices = data['vertices'].tolist()
+            if self.csr.index.keys() != set(vertices):
+                raise ValueError("landmark file does not match the vertices of the graph")
+            self.landmarks = [vertices[i] for i in data['landmarks']]
+            self.landmark_distances = data['distances']
+        self._landmark_index = {vertex: i for i, vertex in enumerate(vertices)}
+
+    def _dijkstra_array(self, source, index):
+        # returns array with the distances from source vertex to all vertices
+        # index is dictionary {vertex: index in array}
+        distance = np.full(len(index), np.inf)
+        for vertex, d in self._dijkstra(source).items():
+            distance[index[vertex]] = d
+        return distance
+
+    def shortest_paths(self, pairs):
+        # finds the shortest paths between many (start, goal) pairs at once
+        # pairs is list of tuples (start vertex, goal vertex)
+        # a single shortest path tree is grown from each distinct start vertex and reused for all its goals;
+        #   as edges are undirected, the trees are grown from the goals instead if there are fewer distinct goals
+        # each tree stops growing as soon as all goals of its start vertex are reached
+        # returns list with a Path object for each pair (its cost is the accumulated cost), or None if not connected
+        pairs = list(pairs)
+        reverse = len({goal for _, goal in pairs}) < len({start for start, _ in pairs})
+        targets = dict()  # {root of tree: set of vertices to reach}
+        for start, goal in pairs:
+            root, target = (goal, start) if reverse else (start, goal)
+            targets.setdefault(root, set()).add(target)
+        trees = {root: self._dijkstra_tree(root, vertices) for root, vertices in targets.items()}
+        paths = []
+        for start, goal in pairs:
+            root, target = (goal, start) if reverse else (start, goal)
+            distance, previous = trees[root]
+            if target not in distance:
+                paths.append(None)
+                continue
+            keys = [target]
+            while keys[-1] != root:
+                keys.append(previous[keys[-1]])
+            paths.append(self._get_path(keys if reverse else keys[::-1], distance[target]))
+        return paths
+
+    def _dijkstra(self, source):
+        # returns dictionary {vertex: distance} with the lengths of the shortest paths from source vertex
+        # to all reachable vertices, using edge attribute "cost" (default 1.0)
+        return self._dijkstra_tree(source)[0]
+
+    def _dijkstra_tree(self, source, targets=None):
+        # grows the shortest path tree from source vertex, using edge attribute "cost" (default 1.0)
+        # targets is a set of vertices, default is None
+        #   if given, the search stops as soon as the shortest paths to all targets are known
+        # returns tuple with dictionaries {vertex: distance} and {vertex: previous vertex on shortest path}
+        #   the distances of vertices that are not reached yet when the search stops are upper bounds
+        # the search uses the vertex ids of self.csr, the result is converted back into vertices
+        vertices, index = self.csr.vertices, self.csr.index
+        offsets, neighbors, costs = self.csr.offsets, self.csr.neighbors, self.csr.costs
+        source = index[source]
+        distance = {source: 0.0}
+        previous = dict()
+        heap = [(0.0, 0, source)]  # counter breaks ties in the order the vertices are reached
+        counter = 1
+        done = set()
+        remaining = None if targets is None else {index[vertex] for vertex in targets if vertex in index}
+        while heap:
+            d, _, vertex = heapq.heappop(heap)
+            if vertex in done:
+                continue
+            done.add(vertex)
+            if remaining is not None:
+                remaining.discard(vertex)
+                if not remaining:
+                    break
+            start, end = offsets.item(vertex), offsets.item(vertex + 1)
+            for neighbor, cost in zip(neighbors[start:end].tolist(), costs[start:end].tolist()):
+                new_d = d + cost
+                if new_d < distance.get(neighbor, np.inf):
+                    distance[neighbor] = new_d
+                    previous[neighbor] = vertex
+                    heapq.heappush(heap, (new_d, counter, neighbor))
+                    counter += 1
+        if remaining is not None:  # keep only the distances that are known to be shortest
+            distance = {vertex: distance[vertex] for vertex in done}
+        return ({vertices[vertex]: d for vertex, d in distance.items()},
+                {vertices[vertex]: vertices[p] for vertex, p in previous.items()})
+
+    def compile_rules(self):
+        # compiles the production rules into a successor function (see state_space.Problem.compile_rules)
+        # instead of applying every rule, i.e. checking every vertex, the successor function
+        #   takes the neighbors of the vertex from a copy of the CSR arrays of self.csr,
+        #   in which the neighbors of each vertex are sorted once in the order of the rules
+        # returns function, or None if not all rules are graph production rules, if a vertex has several rules,
+        #   or if a subclass overrides method get_cost
+        if type(self).get_cost is not Graph.get_cost:
+            return None
+        if not all(isinstance(rule, ProductionRule) and type(rule).apply is ProductionRule.apply for rule in self.rules):
+            return None
+        ids = [self.csr.index[rule.next_vertex] for rule in self.rules if rule.next_vertex in self.csr.index]
+        if len(set(ids)) < len(ids):
+            return None
+        num_of_vertices = len(self.csr.vertices)
+        rank = np.full(num_of_vertices, -1, dtype=np.int64)  # position of each vertex in the rules, -1 if no rule
+        rank[ids] = np.arange(len(ids))
+        sources = np.repeat(np.arange(num_of_vertices), np.diff(self.csr.offsets))
+        ranks = rank[self.csr.neighbors]
+        order = np.lexsort((ranks, sources))
+        order = order[ranks[order] >= 0]
+        offsets = np.zeros(num_of_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources[order], minlength=num_of_vertices), out=offsets[1:])
+        neighbors, costs = self.csr.neighbors[order], self.csr.costs[order]
+
+        def successors(state):
+            start, end = offsets.item(state.vertex_id), offsets.item(state.vertex_id + 1)
+            return [(State(self, vertex_id=vertex_id), cost)
+                    for vertex_id, cost in zip(neighbors[start:end].tolist(), costs[start:end].tolist())]
+
+        return successors
 
     def get_cost(self, edge):
         # returns the cost of given edge (tuple)
         # which is the edge's attribute "cost"
-        if edge[1] in self.graph.neighbors(edge[0]) and 'cost' in self.graph[edge[0]][edge[1]]:
-            return self.graph[edge[0]][edge[1]]['cost']
+        position = self._find_edge(edge)
+        if position >= 0 and self.csr.has_cost[position]:
+            return self.csr.costs.item(position)
         else:
             return 1.0
 
+    def _find_edge(self, edge):
+        # returns the position of given edge (tuple) in self.csr.neighbors, or -1 if the graph has no such edge
+        if edge[1] not in self.csr.index:
+            return -1
+        return self.csr.find_edge(self.csr.index[edge[0]], self.csr.index[edge[1]])
+
     def plot(self, positions=None):
         # plots graph
         # positions is a dictionary {node: [x, y]} where [x, y] is the node coordinate
         #   if positions is not given, the networkx.spring_layout is used
+        import networkx as nx
         if positions is None:
             positions = nx.spring_layout(self.graph)
         heuristic = nx.get_node_attributes(self.graph, "h")
@@ -70,6 +392,60 @@ class Graph(state_space.Problem):
         if cost:
             nx.draw_networkx_edge_labels(self.graph, positions, cost)
 
+    def save(self, filename):
+        # saves graph to given file in numpy .npz format
+        # the graph is stored in compressed sparse row (CSR) format:
+        #   vertices: array with the vertices (names)
+        #   offsets: the neighbors of vertex i are neighbors[offsets[i]:offsets[i+1]]
+        #   neighbors: array with vertex indices
+        #   costs: array with the cost of each edge in neighbors (NaN if the edge has no attribute "cost")
+        #   heuristic: array with the heuristic value of each vertex (NaN if the vertex has no attribute "h")
+        #   start, goal, rules: indices of the start vertex, goal vertex, and vertices in the order of the production rules
+        # the file can be loaded with method load
+        csr, index = self.csr, self.csr.index
+        np.savez(filename,
+                 vertices=Graph._vertex_array(csr.vertices),
+                 offsets=csr.offsets,
+                 neighbors=csr.neighbors,
+                 costs=np.where(csr.has_cost, csr.costs, np.nan).astype(float),
+                 heuristic=csr.heuristic.astype(float),
+                 start=index[self.start],
+                 goal=index[self.goal],
+                 rules=np.array([index[rule.next_vertex] for rule in self.rules], dtype=np.int64))
+
+    @staticmethod
+    def load(filename):
+        # creates Graph object from given .npz file created with method save
+        # the file may contain pickled vertices (see method _vertex_array), so only load files you trust
+        with np.load(filename, allow_pickle=True) as data:
+            vertices = data['vertices'].tolist()
+            graph = Graph.from_csr(vertices, data['offsets'], data['neighbors'], data['costs'], data['heuristic'],
+                                   start=vertices[data['start']], goal=vertices[data['goal']])
+            graph.rules = [ProductionRule(vertices[i]) for i in data['rules']]
+        return graph
+
+    @staticmethod
+    def _vertex_array(vertices):
+        # returns one-dimensional numpy array with given vertices, used to save them
+        # strings or integers are stored as such, other vertices (e.g. tuples (row, column) of networkx.grid_2d_graph,
+        #   or a mix of strings and integers) are stored in an array of objects, which numpy saves with pickle
+        array = np.array(vertices)
+        if array.ndim == 1 and array.dtype.kind in 'iuU' and array.tolist() == list(vertices):
+            return array
+        return np.fromiter(vertices, dtype=object, count=len(vertices))
+
+    @staticmethod
+    def from_csr(vertices, offsets, neighbors, costs=None, heuristic=None, start="S", goal="G"):
+        # creates Graph object from arrays in compressed sparse row (CSR) format (see method save)
+        # vertices is list of vertices (names)
+        # offsets, neighbors, costs, heuristic are numpy arrays
+        #   costs and heuristic are optional, NaN means that the edge or vertex has no cost or heuristic value
+        # start is the start vertex (default "S")
+        # goal is the goal vertex (default "G")
+        # each undirected edge must be stored twice, once for each of its vertices
+        # the arrays are used as they are (see class CSRGraph), no networkx.Graph object is created
+        return Graph(CSRGraph(vertices, offsets, neighbors, costs, heuristic), start, goal)
+
     @staticmethod
     def create(edges, start="S", goal="G", heuristic=None):
         # creates Graph object from given nodes and edges
@@ -77,6 +453,7 @@ class Graph(state_space.Problem):
         # start is the start node (default "S")
         # goal is the goal node (default "G")
         # heuristic is dict {node=h} with heuristic values, default is None
+        import networkx as nx
         graph = nx.Graph()
         for node in {node for edge in edges for node in edge[:2]}:
             graph.add_node(node)
@@ -137,6 +514,79 @@ class Graph(state_space.Problem):
             edges += new_edges
         return Graph.create(edges, heuristic=heuristic)
 
+    @staticmethod
+    def create_random_large(num_of_nodes, max_num_of_edges=3, min_cost=5, max_cost=10, seed=None):
+        # creates large random Graph object with the same layered structure as method create_random
+        # but using vectorized numpy sampling, so graphs with millions of nodes can be created
+        # num_of_nodes is a list with num_of_nodes[i] the number of nodes in intermediate layer i
+        # max_num_of_edges is the maximum of number of edges between two layers
+        # for each edge a random cost is generated between min_cost and max_cost (positive integers)
+        # seed is random seed for numpy.random.default_rng (int)
+        # the vertices are integers: the start vertex is 0, the goal vertex is the last vertex
+        # the heuristic value of a vertex is min_cost times the number of layers between the vertex and the goal
+        #   as edges only connect vertices in the same or in adjacent layers, this heuristic is consistent
+        rng = np.random.default_rng(seed)
+        sizes = list(num_of_nodes) + [1]  # last layer contains goal
+        sources, targets, layers = [], [], [np.zeros(1, dtype=np.int64)]  # layers[i] contains vertices in layer i
+        layer1 = np.zeros(1, dtype=np.int64)  # start vertex
+        first = 1  # first vertex of next layer
+        for k, n in enumerate(sizes):
+            layer2 = np.arange(first, first + n)
+            first += n
+            vertices = np.concatenate((layer1, layer2))
+            m = len(vertices)
+            num_of_pairs = m * (m - 1) // 2
+            pairs = rng.choice(num_of_pairs, size=min(max_num_of_edges, num_of_pairs), replace=False)
+            i, j = Graph._unrank_pairs(pairs, m)
+            u, v = vertices[i], vertices[j]
+            if k == 0 and not np.any(u == 0) and len(u) > 0:  # connect start vertex
+                u, v = np.append(u, 0), np.append(v, u[rng.integers(len(u))])
+            sources.append(u)
+            targets.append(v)
+            # vertices in layer2 that are connected to an edge
+            # if there are none, the next layer is not connected to this one, as in method create_random
+            layer1 = np.unique(np.concatenate((u, v)))
+            layer1 = layer1[layer1 >= first - n]
+            layers.append(layer1)
+        layers[-1] = np.array([first - 1])  # goal is always added, even if it is not connected
+        # remove duplicate edges, keeping the last one as method create_random does
+        sources, targets = np.concatenate(sources), np.concatenate(targets)
+        sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        costs = rng.integers(min_cost, max_cost + 1, size=len(sources)).astype(float)
+        _, index = np.unique((sources * first + targets)[::-1], return_index=True)
+        index = len(sources) - 1 - index
+        sources, targets, costs = sources[index], targets[index], costs[index]
+        # relabel vertices as 0, 1, 2, ...
+        vertices = np.concatenate(layers)
+        heuristic = np.repeat(min_cost * np.arange(len(layers) - 1, -1, -1, dtype=float), [len(l) for l in layers])
+        order = np.argsort(vertices)
+        vertices, heuristic = vertices[order], heuristic[order]
+        sources, targets = np.searchsorted(vertices, sources), np.searchsorted(vertices, targets)
+        # compressed sparse row format, each edge is stored for both its vertices
+        offsets, neighbors, costs = Graph._edges_to_csr(len(vertices), sources, targets, costs)
+        return Graph.from_csr(list(range(len(vertices))), offsets, neighbors, costs, heuristic,
+                              start=0, goal=len(vertices) - 1)
+
+    @staticmethod
+    def _unrank_pairs(pairs, m):
+        # converts indices of pairs (i, j) with 0 <= i < j < m, enumerated in lexicographic order,
+        # into arrays i and j
+        pairs = np.asarray(pairs, dtype=np.int64)
+        i = m - 2 - np.floor(np.sqrt(-8.0 * pairs + 4.0 * m * (m - 1) - 7) / 2.0 - 0.5).astype(np.int64)
+        j = pairs + i + 1 - m * (m - 1) // 2 + (m - i) * (m - i - 1) // 2
+        return i, j
+
+    @staticmethod
+    def _edges_to_csr(num_of_vertices, sources, targets, costs):
+        # converts undirected edges into compressed sparse row format (see method save)
+        # returns arrays offsets, neighbors, costs
+        rows = np.concatenate((sources, targets))
+        columns = np.concatenate((targets, sources))
+        order = np.argsort(rows, kind='stable')
+        offsets = np.zeros(num_of_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_of_vertices), out=offsets[1:])
+        return offsets, columns[order], np.concatenate((costs, costs))[order]
+
 
 class ProductionRule(state_space.ProductionRule):
     # class to define a graph production rule
@@ -181,6 +631,8 @@ class Move(state_space.Move):
     # class to define a graph move
     # inherits from state_space.Move
 
+    __slots__ = ()
+
     def __init__(self, state, rule, cost=0.0):
         # state is a State object
         # rule is a ProductionRule object
@@ -196,21 +648,36 @@ class State(state_space.State):
     # class to define graph state
     # inherits from state_space.State
 
-    def __init__(self, graph, vertex):
+    __slots__ = ('vertex_id',)
+
+    def __init__(self, graph, vertex=None, vertex_id=None):
         # graph is a Graph object
         # vertex is the current node in graph (string)
+        # vertex_id is the id of the vertex in graph.csr (int), which can be given instead of vertex
         super().__init__(graph)
-        self.vertex = vertex
+        self.vertex_id = graph.csr.index[vertex] if vertex_id is None else vertex_id
+
+    @property
+    def vertex(self):
+        # returns the current node in graph
+        return self.problem.csr.vertices[self.vertex_id]
 
     @property
     def graph(self):
         return self.problem
 
+    @property
+    def key(self):
+        # returns vertex
+        return self.vertex
+
     def is_valid_move(self, move):
         # checks if move is valid
         # move is Move object
         # returns boolean
-        return move.rule.next_vertex in self.problem.graph.neighbors(self.vertex)
+        index = self.graph.csr.index
+        return (move.rule.next_vertex in index and
+                self.graph.csr.find_edge(self.vertex_id, index[move.rule.next_vertex]) >= 0)
 
     def apply_move(self, move):
         # applies move to state self to get new state
@@ -232,7 +699,12 @@ class State(state_space.State):
         # checks if state self is equal to other state
         # two states are the same if their current vertices are the same
         # returns boolean
-        return self.vertex == other.vertex
+        return self.vertex_id == other.vertex_id
+
+    def __hash__(self):
+        # overrides inherited __hash__ method, consistent with __eq__
+        # required to use states as dictionary keys
+        return hash(self.vertex_id)
 
     def __repr__(self):
         # overrides inherited __repr__ method
@@ -244,6 +716,8 @@ class Path(state_space.Path):
     # class to define path in graph
     # inherits from state_space.Path
 
+    __slots__ = ()
+
     def __init__(self, states, cost=0.0):
         # states is a list of State objects
         super().__init__(states, cost)
@@ -258,6 +732,8 @@ class PathSeries(state_space.PathSeries):
     # class to define series of graph paths
     # inherits from state_space.PathSeries
 
+    __slots__ = ()
+
     def __init__(self, paths):
         # paths is a list of Path objects
         super().__init__(paths)
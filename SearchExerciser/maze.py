@@ -3,15 +3,16 @@
 # May 2022
 from . import state_space
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import colors
+import hashlib
 from time import sleep
-from IPython.display import clear_output
+# matplotlib and IPython are imported in the plot methods only, as importing them takes time and memory
 
 
 class Position:
     # class to define maze position (irow, icol)
 
+    __slots__ = ('irow', 'icol')
+
     def __init__(self, irow, icol):
         # irow is row index (int)
         # icol is column index (int)
@@ -24,6 +25,11 @@ class Position:
         # returns boolean
         return self.irow == other.irow and self.icol == other.icol
 
+    def __hash__(self):
+        # overrides inherited __hash__ method, consistent with __eq__
+        # required to use positions (and states) as dictionary keys
+        return hash((self.irow, self.icol))
+
     def __repr__(self):
         # overrides inherited __repr__ method
         # returns string (irow, icol)
@@ -34,31 +40,152 @@ class Maze(state_space.Problem):
     # class to define maze grid
 
     symbols = ('*', '.', '#', 'o')  # start = *, free = ., wall = #, goal = o
+    block_size = 2 ** 24  # number of cells processed at once when scanning the grid
+    min_batch_size = 16  # minimum number of states for which the heuristic is computed with numpy
+    max_compiled_cells = 2 ** 22  # maximum number of cells for which the production rules are compiled
 
     def __init__(self, grid, rules=None):
         # grid is an integer array: start = 0, free = 1, wall = 2, goal = 3
+        #   an integer numpy array, e.g. a uint8 array or a numpy.memmap (see method load),
+        #   is used as backing store as it is, without making a copy
+        #   other input (e.g. list of lists) is converted into a uint8 array
         # size is the number of rows which is equal to the number of columns
         # rules is list of ProductionRule objects, default is [Left(), Right(), Up(), Down()]
         super().__init__([Left(), Right(), Up(), Down()] if rules is None else rules)
-        self.grid = np.array(grid, dtype=int)
-        self.size = self.grid.shape[0]
+        self.grid = grid
+
+    @property
+    def grid(self):
+        # returns grid (numpy array)
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        # sets grid
+        # the grid is a read-only view, so that the cached start and goal positions, distance field,
+        #   and compiled production rules are never out of date: use method update_cells to change individual cells
+        #   (an array given to this setter can still be changed directly, assign it again afterwards)
+        if isinstance(grid, np.ndarray) and grid.dtype.kind in 'iu':
+            self._grid = grid.view()
+        else:
+            self._grid = np.array(grid, dtype=np.uint8)
+        self._grid.flags.writeable = False
+        self.size = self._grid.shape[0]
+        self._clear_cache()
+
+    def _clear_cache(self):
+        # clears the cached start and goal positions and distance field
+        # called when the grid changes
+        self._positions = dict()  # cache {cell value: Position object of first cell with that value}
+        self._goals = None  # set of goal positions, see method get_goal_positions
+        self._distance_field = None  # distance from each cell to nearest goal, see method distance_to_goal
+        self._clear_compiled_rules()  # the valid moves depend on the walls, see method compile_rules
+
+    def __setstate__(self, state):
+        # overrides inherited __setstate__ method, used by pickle and copy.deepcopy
+        # the copied grid is read-only as well (see grid setter)
+        self.__dict__.update(state)
+        self._grid.flags.writeable = False
 
     def _get_initial_queue(self):
         initial_state = State(self, self.get_start_position())
         initial_path = Path([initial_state])
         return PathSeries([initial_path])
 
+    def _get_path(self, keys, cost=0.0):
+        # creates Path object from given state keys (irow, icol) and accumulated cost
+        return Path([State(self, Position(irow, icol)) for irow, icol in keys], cost)
+
+    def fingerprint(self):
+        # returns hash (string) of the grid and the order of the production rules
+        sha = hashlib.sha256()
+        sha.update(repr((self.grid.shape, self.rules)).encode())
+        for rows in self._iterate_blocks():  # a memory-mapped grid is never loaded at once
+            sha.update(np.ascontiguousarray(self.grid[rows], dtype=np.uint8))
+        return sha.hexdigest()
+
     def get_start_position(self):
         # gets start position
-        # returns Position object
-        irow, icol = np.where(self.grid == 0)
-        return Position(irow[0], icol[0])
+        # returns Position object (None if there is no start)
+        return self._find_first(0)
 
     def get_goal_position(self):
         # gets goal position
-        # returns Position object
-        irow, icol = np.where(self.grid == 3)
-        return Position(irow[0], icol[0])
+        # returns Position object (None if there is no goal)
+        #   if there are several goals, the first one (in row-major order) is returned
+        return self._find_first(3)
+
+    def get_goal_positions(self):
+        # gets all goal positions, a maze may have several goals (e.g. exits)
+        # the search stops at any goal, e.g. uniform cost and A* find the path to the nearest goal
+        # returns frozenset of Position objects
+        # the result is cached, as searching calls this method for each new state
+        if self._goals is None:
+            goals = []
+            for rows in self._iterate_blocks():
+                index = np.flatnonzero(self.grid[rows] == 3)
+                irow, icol = np.divmod(index, self.grid.shape[1])
+                goals.extend(Position(rows.start + int(r), int(c)) for r, c in zip(irow, icol))
+            self._goals = frozenset(goals)
+        return self._goals
+
+    def _find_first(self, value):
+        # returns Position object of the first cell (in row-major order) with given value, or None
+        # the result is cached, as the heuristic calls get_goal_position for each new state
+        # the position is stored when it is found, so that searches running at the same time never see a partial result
+        if value not in self._positions:
+            position = None
+            for rows in self._iterate_blocks():
+                index = np.flatnonzero(self.grid[rows] == value)
+                if index.size > 0:
+                    irow, icol = divmod(int(index[0]), self.grid.shape[1])
+                    position = Position(rows.start + irow, icol)
+                    break
+            self._positions[value] = position
+        return self._positions[value]
+
+    def compile_rules(self):
+        # compiles the production rules into a successor function (see state_space.Problem.compile_rules)
+        # the valid moves of all cells are computed at once with numpy by shifting the grid:
+        #   bit k of cell (irow, icol) in the table is set if rule k can be applied to the cell,
+        #   so a successor only takes one table lookup instead of a Move object and a validity check per rule
+        # the table has the same size as the grid and is computed again when the grid changes (see _clear_cache),
+        #   it is computed once for all searches, as searches share the problem (see search.base.SearchAlgorithm)
+        # grids with more than self.max_compiled_cells cells are not compiled, as the table would take too much memory
+        #   and a short search would spend most of its time computing it
+        # returns function, or None if the grid is too large, if not all rules are maze production rules
+        #   (e.g. subclasses with other costs), or if a subclass overrides method is_valid_position
+        if self.grid.size > self.max_compiled_cells or type(self).is_valid_position is not Maze.is_valid_position:
+            return None
+        if len(self.rules) > 64 or not all(isinstance(rule, ProductionRule) and
+                                           type(rule).apply is ProductionRule.apply for rule in self.rules):
+            return None
+        free = self.grid != 2
+        valid = np.zeros(self.grid.shape, dtype=np.min_scalar_type((1 << len(self.rules)) - 1))
+        for k, rule in enumerate(self.rules):
+            rows, new_rows = self._shift(rule.drow, self.grid.shape[0])
+            cols, new_cols = self._shift(rule.dcol, self.grid.shape[1])
+            valid[rows, cols] |= free[new_rows, new_cols].astype(valid.dtype) << k
+        moves = [(rule.drow, rule.dcol, 1 << k) for k, rule in enumerate(self.rules)]
+
+        def successors(state):
+            irow, icol = state.position.irow, state.position.icol
+            bits = valid.item(irow, icol)
+            return [(State(self, Position(irow + drow, icol + dcol)), 1.0) for drow, dcol, bit in moves if bits & bit]
+
+        return successors
+
+    @staticmethod
+    def _shift(delta, length):
+        # returns tuple of slices (cells, new cells) along one axis for a move over delta cells
+        # cells[i] + delta = new_cells[i], both inside the grid
+        return slice(max(0, -delta), length - max(0, delta)), slice(max(0, delta), length - max(0, -delta))
+
+    def _iterate_blocks(self):
+        # generates slices of rows containing approximately self.block_size cells
+        nrows = max(1, self.block_size // max(1, self.grid.shape[1]))
+        for irow in range(0, self.grid.shape[0], nrows):
+            yield slice(irow, min(irow + nrows, self.grid.shape[0]))
 
     def is_valid_position(self, position):
         # checks if position is valid: must be inside the grid and may not coincide with wall
@@ -68,26 +195,92 @@ class Maze(state_space.Problem):
                 0 <= position.icol < self.size and
                 self.grid[position.irow, position.icol] != 2)
 
+    def update_cells(self, cells):
+        # changes the value of the given cells in the grid, e.g. to open or close a door
+        # cells is dictionary {(irow, icol): value} with value 0, 1, 2, or 3 (see constructor)
+        # returns list of State objects at the changed cells
+        #   which can be passed to an incremental search algorithm (see search.incremental.LPAS.update)
+        # raises ValueError if the grid cannot be changed (e.g. a grid loaded with mmap_mode='r')
+        states = []
+        self._grid.flags.writeable = True  # read-only outside this method, see grid setter
+        try:
+            for (irow, icol), value in cells.items():
+                if self.grid[irow, icol] != value:
+                    self.grid[irow, icol] = value
+                    states.append(State(self, Position(irow, icol)))
+        finally:
+            self._grid.flags.writeable = False
+        if states:
+            self._clear_cache()  # start or goal may have changed
+        return states
+
     def distance_to_goal(self, position):
-        # returns Manhattan distance from given position to goal position
+        # returns Manhattan distance from given position to nearest goal position
+        # if there are several goals, the distance is looked up in a distance field,
+        #   which is computed once (see method _compute_distance_field)
+        if len(self.get_goal_positions()) > 1:
+            if self._distance_field is None:
+                self._distance_field = self._compute_distance_field()
+            return int(self._distance_field[position.irow, position.icol])
         goal = self.get_goal_position()
         return abs(goal.irow - position.irow) + abs(goal.icol - position.icol)
 
-    def plot(self):
+    def apply_heuristic_batch(self, states):
+        # returns list with the Manhattan distance from each given state to the nearest goal position
+        # the distances of all states are computed at once with numpy (see method distance_to_goal)
+        #   unless there are fewer than self.min_batch_size states, as numpy has a fixed overhead per call
+        if len(states) < self.min_batch_size:
+            return super().apply_heuristic_batch(states)
+        irow = np.fromiter((state.position.irow for state in states), dtype=np.int64, count=len(states))
+        icol = np.fromiter((state.position.icol for state in states), dtype=np.int64, count=len(states))
+        if len(self.get_goal_positions()) > 1:
+            if self._distance_field is None:
+                self._distance_field = self._compute_distance_field()
+            return self._distance_field[irow, icol].tolist()
+        goal = self.get_goal_position()
+        return (np.abs(goal.irow - irow) + np.abs(goal.icol - icol)).tolist()
+
+    def _compute_distance_field(self):
+        # returns integer array with the Manhattan distance from each cell to the nearest goal
+        # walls are ignored, so the distance is an admissible and consistent heuristic
+        # the distance transform is separable: a forward and backward pass along the rows,
+        #   followed by a forward and backward pass along the columns (each pass is vectorized)
+        nrows, ncols = self.grid.shape
+        field = np.where(np.asarray(self.grid) == 3, 0, nrows + ncols).astype(np.int32)
+        for j in range(1, ncols):
+            np.minimum(field[:, j], field[:, j - 1] + 1, out=field[:, j])
+        for j in range(ncols - 2, -1, -1):
+            np.minimum(field[:, j], field[:, j + 1] + 1, out=field[:, j])
+        for i in range(1, nrows):
+            np.minimum(field[i], field[i - 1] + 1, out=field[i])
+        for i in range(nrows - 2, -1, -1):
+            np.minimum(field[i], field[i + 1] + 1, out=field[i])
+        return field
+
+    def plot(self, max_cells=500):
         # plots maze
+        # max_cells is the maximum number of cells plotted per row and column (int), default is 500
+        #   larger mazes are subsampled, so only a small part of a memory-mapped grid is read
+        import matplotlib.pyplot as plt
+        from matplotlib import colors
         cmap = colors.ListedColormap(['forestgreen', 'lightyellow', 'purple', 'red'])  # colormap
         bounds = np.linspace(-0.5, 3.5, 5)
         norm = colors.BoundaryNorm(bounds, cmap.N)
         # plot grid
-        plt.matshow(self.grid, cmap=cmap, norm=norm)
-        # axes
         xmax = self.size - 0.5
         ymax = self.size - 0.5
+        step = int(np.ceil(self.size / max_cells))
+        plt.matshow(np.asarray(self.grid[::step, ::step]), cmap=cmap, norm=norm, extent=(-0.5, xmax, ymax, -0.5))
+        # axes
         ax = plt.gca()
         ax.set_aspect("equal")
-        ax.set_xticks(np.linspace(-0.5, xmax, self.size + 1))
+        if step == 1:
+            ax.set_xticks(np.linspace(-0.5, xmax, self.size + 1))
+            ax.set_yticks(np.linspace(-0.5, ymax, self.size + 1))
+        else:  # cells are too small to draw grid lines
+            ax.set_xticks([])
+            ax.set_yticks([])
         ax.set_xticklabels([])
-        ax.set_yticks(np.linspace(-0.5, ymax, self.size + 1))
         ax.set_yticklabels([])
         ax.tick_params(axis=u'both', which=u'both', length=0)
         # plot grid and set axis limits
@@ -98,13 +291,38 @@ class Maze(state_space.Problem):
     def __repr__(self):
         # overrides inherited __repr__ method
         # returns string
-        return "\n".join([''.join([self.symbols[item] for item in row]) for row in self.grid])
+        symbols = np.frombuffer("".join(self.symbols).encode('ascii'), dtype=np.uint8)
+        return "\n".join([symbols[row].tobytes().decode('ascii') for row in np.asarray(self.grid)])
+
+    def save(self, filename):
+        # saves grid to given file in numpy .npy format, using 1 byte per cell
+        # the file can be loaded with method load
+        np.save(filename, np.ascontiguousarray(self.grid, dtype=np.uint8))
+
+    @staticmethod
+    def load(filename, mmap_mode='r'):
+        # creates Maze object from given .npy file created with method save
+        # mmap_mode is passed to numpy.load, default is 'r'
+        #   'r': the grid is memory-mapped read-only, so loading is immediate and the grid is not copied into memory
+        #   'r+': the grid is memory-mapped and changes (e.g. method update_cells) are written to the file
+        #   'c': the grid is memory-mapped copy-on-write, changes are kept in memory only
+        #   None: the grid is read into memory
+        return Maze(np.load(filename, mmap_mode=mmap_mode))
 
     @staticmethod
     def create(maze):
         # creates Maze object
         # maze is list of strings: start = '*', free = '.', wall = '#', goal = 'o'
-        return Maze(grid=[[Maze.symbols.index(symbol) for symbol in row] for row in maze])
+        # all strings must have the same length
+        lookup = np.full(256, 255, dtype=np.uint8)  # translates ASCII code of symbol into cell value
+        for value, symbol in enumerate(Maze.symbols):
+            lookup[ord(symbol)] = value
+        if len({len(row) for row in maze}) > 1:
+            raise ValueError("all rows of the maze must have the same length")
+        grid = lookup[np.frombuffer("".join(maze).encode('ascii'), dtype=np.uint8)]
+        if np.any(grid == 255):
+            raise ValueError(f"maze symbols must be one of {Maze.symbols}")
+        return Maze(grid=grid.reshape(len(maze), -1))
 
     @staticmethod
     def create_random(size, num_of_walls, seed=None):
@@ -112,7 +330,7 @@ class Maze(state_space.Problem):
         # size is size of maze
         # num_of_walls is number of randomly chosen walls in maze (int)
         # seed is random seed for numpy.random.choice function (int)
-        maze = np.ones((size, size))  # free
+        maze = np.ones((size, size), dtype=np.uint8)  # free
         maze[0, 0] = 0  # start
         maze[-1, -1] = 3  # goal
         if seed is not None:  # set seed
@@ -122,6 +340,103 @@ class Maze(state_space.Problem):
         maze[irow, icol] = 2  # wall
         return Maze(maze)
 
+    @staticmethod
+    def create_random_solvable(size, num_of_walls=None, seed=None, max_tries=100):
+        # creates Maze object randomly, with a guaranteed path from start (upper left) to goal (lower right)
+        # size is size of maze
+        # num_of_walls is number of randomly chosen walls in maze (int)
+        #   if num_of_walls is None (default), the maze is a spanning tree of passages,
+        #   carved with the (vectorized) binary tree algorithm: all free cells are connected by exactly one path
+        #   if num_of_walls is given, walls are chosen randomly as in method create_random,
+        #   and new walls are drawn until the goal is reachable (see method is_solvable)
+        # seed is random seed (int) or numpy.random.Generator object
+        #   a numpy.random.Generator object is created for each maze, so the global numpy random state is not used
+        # max_tries is maximum number of random mazes to draw if num_of_walls is given (int), default is 100
+        #   a ValueError is raised if none of them is solvable
+        rng = np.random.default_rng(seed)
+        if num_of_walls is None:
+            return Maze(Maze._carve_binary_tree(size, rng))
+        for _ in range(max_tries):
+            grid = np.ones((size, size), dtype=np.uint8)  # free
+            grid.ravel()[rng.choice(size ** 2 - 2, num_of_walls, replace=False) + 1] = 2  # wall
+            grid[0, 0] = 0  # start
+            grid[-1, -1] = 3  # goal
+            maze = Maze(grid)
+            if maze.is_solvable():
+                return maze
+        raise ValueError(f"no solvable maze found in {max_tries} tries, reduce num_of_walls")
+
+    @staticmethod
+    def _carve_binary_tree(size, rng):
+        # returns grid with passages carved by the binary tree algorithm
+        # cells with even row and column index are free,
+        # each of these cells is connected to the cell above or to the cell on its left (chosen randomly)
+        # if size is even, the goal in the lower right corner is a dead end next to the last of these cells
+        grid = np.full((size, size), 2, dtype=np.uint8)  # wall
+        grid[::2, ::2] = 1  # free
+        n = (size + 1) // 2  # number of cells per row and column
+        up = rng.random((n, n)) < 0.5
+        up[0, :] = False  # first row can only connect to the left
+        up[:, 0] = True  # first column can only connect upwards
+        left = ~up
+        up[0, 0] = False  # first cell has no passage
+        irow, icol = np.nonzero(up)
+        grid[2 * irow - 1, 2 * icol] = 1  # upward passage
+        irow, icol = np.nonzero(left)
+        grid[2 * irow, 2 * icol - 1] = 1  # passage to the left
+        if size % 2 == 0:  # goal is not a tree cell, connect it to the last tree cell with a single passage
+            grid[-1, -2] = 1
+        grid[0, 0] = 0  # start
+        grid[-1, -1] = 3  # goal
+        return grid
+
+    def is_solvable(self):
+        # checks if a goal can be reached from the start
+        # returns boolean
+        goals = self.get_goal_positions()
+        if not goals:
+            return False
+        reachable = self.get_reachable_cells()
+        return any(reachable[goal.irow, goal.icol] for goal in goals)
+
+    def get_reachable_cells(self):
+        # returns boolean array indicating the cells that can be reached from the start
+        start = self.get_start_position()
+        if start is None:
+            return np.zeros(self.grid.shape, dtype=bool)
+        labels = self.label_regions()
+        return labels == labels[start.irow, start.icol]
+
+    def label_regions(self):
+        # labels the connected regions of non-wall cells
+        # returns integer array with the same label for cells in the same region (-1 for walls)
+        # vectorized connected-component labeling: each region is a tree of cells pointing to a parent cell,
+        # in each round the root of a region is attached to the smallest neighboring root,
+        # after which all cells are pointed directly to their root ("pointer jumping")
+        free = np.asarray(self.grid).ravel() != 2
+        nrows, ncols = self.grid.shape
+        dtype = np.int32 if free.size < 2 ** 31 else np.int64
+        index = np.arange(free.size, dtype=dtype).reshape(nrows, ncols)
+        grid = free.reshape(nrows, ncols)
+        horizontal = grid[:, :-1] & grid[:, 1:]
+        vertical = grid[:-1, :] & grid[1:, :]
+        u = np.concatenate((index[:, :-1][horizontal], index[:-1, :][vertical]))  # pairs of adjacent free cells
+        v = np.concatenate((index[:, 1:][horizontal], index[1:, :][vertical]))
+        parent = index.ravel().copy()
+        while True:
+            pu, pv = parent[u], parent[v]
+            different = pu != pv
+            if not np.any(different):
+                break
+            u, v, pu, pv = u[different], v[different], pu[different], pv[different]  # drop connected pairs
+            np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))  # attach roots to smaller roots
+            while True:  # pointer jumping
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+        return np.where(free, parent, -1).reshape(nrows, ncols)
+
 
 class ProductionRule(state_space.ProductionRule):
     # class to define maze production rule: left, right, up, down
@@ -194,6 +509,8 @@ class Move(state_space.Move):
     # class to define a maze move
     # inherits from state_space.Move
 
+    __slots__ = ()
+
     def __init__(self, state, rule, cost=0.0):
         # state is State object
         # rule is ProductionRule object
@@ -210,6 +527,8 @@ class State(state_space.State):
     # class to define maze state
     # inherits from state_space.State
 
+    __slots__ = ('position',)
+
     def __init__(self, maze, position):
         # maze is a Maze object
         # position is a Position object
@@ -221,6 +540,11 @@ class State(state_space.State):
     def maze(self):
         return self.problem
 
+    @property
+    def key(self):
+        # returns tuple (irow, icol)
+        return int(self.position.irow), int(self.position.icol)
+
     def is_valid_move(self, move):
         # checks if given move is valid
         # move is Move object
@@ -240,10 +564,10 @@ class State(state_space.State):
     def is_goal(self):
         # checks if state self is a goal state
         # returns boolean
-        return self.maze.get_goal_position() == self.position
+        return self.position in self.maze.get_goal_positions()
 
     def apply_heuristic(self):
-        # returns Manhattan distance from current position to goal position
+        # returns Manhattan distance from current position to nearest goal position
         return self.maze.distance_to_goal(self.position)
 
     def __eq__(self, other):
@@ -253,6 +577,10 @@ class State(state_space.State):
         # returns boolean
         return self.position == other.position
 
+    def __hash__(self):
+        # overrides inherited __hash__ method, consistent with __eq__
+        return hash(self.position)
+
     def __repr__(self):
         # overrides inherited __repr__ method
         # returns string with position coordinate
@@ -263,30 +591,33 @@ class Path(state_space.Path):
     # class to define maze path
     # inherits from state_space.Path
 
+    __slots__ = ()
+
     def __init__(self, states, cost=0.0):
         # states is list of State objects
         super().__init__(states, cost)
 
     def plot(self):
         # plots path in maze
+        import matplotlib.pyplot as plt
         self[-1].maze.plot()
-        x = np.arange(0, self[-1].maze.grid.size)
-        plt.plot(x[self[-1].position.icol], x[self[-1].position.irow], 'bo')
+        plt.plot(self[-1].position.icol, self[-1].position.irow, 'bo')
         positions = [state.position for state in self[:-1]]
         irow = np.array([position.irow for position in positions])
         icol = np.array([position.icol for position in positions])
         if len(positions) > 0:
-            plt.plot(x[icol], x[irow], 'ko')
+            plt.plot(icol, irow, 'ko')
 
     def plot_live(self, wait=0.5):
         # plots live path in maze
-        x = np.arange(0, self[-1].maze.grid.size)
+        import matplotlib.pyplot as plt
+        from IPython.display import clear_output
         icol, irow = [], []
         for position in [state.position for state in self]:
             self[-1].maze.plot()
             irow.append(position.irow)
             icol.append(position.icol)
-            plt.plot(x[icol], x[irow], 'ko')
+            plt.plot(icol, irow, 'ko')
             plt.show()
             sleep(wait)
             clear_output()
@@ -310,6 +641,8 @@ class PathSeries(state_space.PathSeries):
     # class to define series of maze paths
     # inherits from state_space.PathSeries
 
+    __slots__ = ()
+
     def __init__(self, paths):
         # paths is list of Path objects
         super().__init__(paths)
@@ -2,26 +2,113 @@
 # at Vives University of Applied Sciences, Kortrijk, Belgium.
 # May 2022
 from abc import ABC, abstractmethod
-from copy import deepcopy
+from copy import copy, deepcopy
 from time import time
+import tracemalloc
+import threading
+import sys
+import pickle
+import os
+import cProfile
+import pstats
+import io
+import linecache
+
+
+# tracemalloc is shared by all searches that run at the same time (see Algorithm.run)
+# it is started by the first of these searches that needs it and stopped when the last one is finished
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0  # number of running searches that use tracemalloc started by SearchExerciser
+
+
+def _start_tracemalloc(nframes):
+    # starts tracemalloc storing given number of frames if it is not tracing yet
+    # returns True if the search uses tracemalloc started by SearchExerciser and must call _stop_tracemalloc,
+    #   False if tracemalloc was started by the user, in which case it is left running
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start(nframes)
+        _tracemalloc_users += 1
+        return True
+
+
+def _stop_tracemalloc():
+    # stops tracemalloc if no other running search uses it
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
 
 
 class Algorithm(ABC):
+    # superclass for search algorithms
+    # the parameters given to the constructor are the configuration of the algorithm,
+    #   the other attributes are the state and the result of the last search performed by method search
+    # method run performs the search on a copy of the algorithm and returns a SearchResult object,
+    #   so that one configured algorithm can perform several searches at the same time, e.g. in threads
 
     name = ""  # name of algorithm (string)
+    _supports_checkpoints = True  # False if the algorithm cannot save and resume its search (see checkpoint_file)
+    _runs_lock = threading.Lock()  # protects the sets of running searches and the cancel requests (see method cancel)
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
+    def __init__(self, initial_queue, print_result=True, print_queue=False,
+                 max_iterations=None, max_queue_length=None, max_memory=None, max_time=None,
+                 checkpoint_file=None, checkpoint_interval=1000, profile=False):
         # initial_queue is PathSeries object
         # print_result is boolean, default is True
         # print_queue is boolean, default is False
+        # the search budget is set by the following parameters, default is None (no limit):
+        # - max_iterations: maximum number of iterations (int)
+        # - max_queue_length: maximum number of paths in the queue (int)
+        # - max_memory: maximum size in bytes of the queue (int)
+        #     estimated as the length of the queue times the size of a path (see method _estimate_queue_memory),
+        #     so it does not slow down the search and does not depend on other searches running at the same time
+        # - max_time: maximum elapsed time in seconds (float)
+        # if the budget is exhausted, the search stops: attribute budget_exhausted is True,
+        #   attribute stop_reason indicates which limit is reached,
+        #   and attribute best_partial_path is the most promising path in the queue
+        # checkpoint_file is the file the state of the search is saved to (string), default is None (no checkpoints)
+        #   the state is saved every checkpoint_interval iterations (int), default is 1000,
+        #   and when the budget is exhausted; the file is removed when the search is finished
+        #   call search(resume=True) to resume the search from the file (see SearchAlgorithm and blind.IDS)
+        #   raises ValueError if the algorithm does not support checkpoints (e.g. optimal.ARAS and incremental.LPAS)
+        # profile is boolean, default is False
+        #   if True, method search is profiled with modules cProfile and tracemalloc (this slows down the search)
+        #   the results are stored in attributes profile_stats (pstats.Stats object)
+        #   and memory_snapshot (tracemalloc.Snapshot object with the allocations made by SearchExerciser's code)
+        #   see methods profile_report, dump_profile, and dump_memory_snapshot
         self.initial_queue = initial_queue
         self.print_result = print_result
         self.print_queue = print_queue
+        self.max_iterations = max_iterations
+        self.max_queue_length = max_queue_length
+        self.max_memory = max_memory
+        self.max_time = max_time
+        if checkpoint_file is not None and not self._supports_checkpoints:
+            raise ValueError(f"{self.name} does not support checkpoints")
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_owner = None  # algorithm that saves the checkpoint file, None if this algorithm itself
+        self._cancel_requested = False  # set by method cancel
+        self._searching = False  # True while method search is running
+        self._start_pending = False  # True if method search is about to start in another thread (see method search_async)
+        self._runs = set()  # copies of this algorithm performing a search started by method run
+        self.profile = profile
+        self.profile_stats = None
+        self.memory_snapshot = None
+        self._profiler = None
         self.path_to_goal = None
         self.goal_is_reached = False
         self.queue_lengths = [len(self.initial_queue)]
         self.elapsed_time = None
         self.nr_iterations = 0
+        self.budget_exhausted = False
+        self.stop_reason = None
+        self.best_partial_path = None
 
     def _initialize(self):
         # initialize attributes
@@ -31,9 +118,290 @@ class Algorithm(ABC):
         self.queue_lengths = [len(self.initial_queue)]
         self.elapsed_time = None
         self.nr_iterations = 0
+        self.budget_exhausted = False
+        self.stop_reason = None
+        self.best_partial_path = None
+        self._resumed_time = 0.0  # elapsed time before the search was resumed
+        self._resumed_iterations = 0  # number of iterations before the search was resumed
+        if len(self.initial_queue) > 0:
+            self.initial_queue[0][-1].problem.check_compiled_rules()  # the rules may be changed in place
+
+    def _start_budget(self):
+        # starts measuring the budget
+        # called at the start of method search
+        # also starts profiling if self.profile is True
+        # a cancel request made before, when no search was running, is discarded (see method cancel)
+        with self._runs_lock:
+            if not self._start_pending:
+                self._cancel_requested = False
+            self._searching = True
+            self._start_pending = False
+        self._starttime = time()
+        self._tracemalloc_started = False
+        if self.profile:
+            # more frames are needed to attribute allocations in other modules to SearchExerciser's code
+            self._tracemalloc_started = _start_tracemalloc(self._profile_nframes)
+            self.memory_snapshot = None
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _stop_budget(self):
+        # stops measuring the budget
+        # called at the end of method search, also if the search raises an exception
+        # also stops profiling if self.profile is True
+        # the profiler is disabled first, and tracemalloc is stopped even if the profile cannot be stored,
+        #   so that they never keep running after the search
+        profiler, self._profiler = self._profiler, None
+        try:
+            if profiler is not None:
+                profiler.disable()
+                package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                snapshot = tracemalloc.take_snapshot()
+                self.memory_snapshot = snapshot.filter_traces(
+                    [tracemalloc.Filter(True, os.path.join(package, "*"), all_frames=True),
+                     tracemalloc.Filter(False, tracemalloc.__file__)])
+                self.profile_stats = pstats.Stats(profiler)
+        finally:
+            if self._tracemalloc_started:
+                _stop_tracemalloc()
+                self._tracemalloc_started = False
+            with self._runs_lock:
+                self._searching = False
+                self._cancel_requested = False
+
+    def _budget_is_exhausted(self, queue_length=0):
+        # checks if one of the limits of the search budget is reached
+        # the budget applies to each call of method search, also if the search is resumed
+        # queue_length is the current number of paths in the queue
+        # sets attributes budget_exhausted and stop_reason
+        # returns boolean
+        # a search that is cancelled (see method cancel) is treated as a search with an exhausted budget
+        if self._cancel_requested:
+            self.stop_reason = "cancelled"
+        elif self.max_iterations is not None and self.nr_iterations - self._resumed_iterations >= self.max_iterations:
+            self.stop_reason = "iterations"
+        elif self.max_queue_length is not None and queue_length > self.max_queue_length:
+            self.stop_reason = "queue length"
+        elif self.max_time is not None and time() - self._starttime >= self.max_time:
+            self.stop_reason = "time"
+        elif self.max_memory is not None and self._estimate_queue_memory(queue_length) >= self.max_memory:
+            self.stop_reason = "memory"
+        else:
+            return False
+        self.budget_exhausted = True
+        return True
+
+    def _get_budget(self):
+        # returns dictionary with the remaining search budget
+        # used to pass the budget to a search algorithm that performs part of the search (see blind.IDS)
+        return dict(max_iterations=None if self.max_iterations is None else
+                    self.max_iterations - (self.nr_iterations - self._resumed_iterations),
+                    max_queue_length=self.max_queue_length,
+                    max_memory=self.max_memory,
+                    max_time=None if self.max_time is None else self.max_time - (time() - self._starttime))
+
+    def _estimate_queue_memory(self, queue_length):
+        # returns estimated size in bytes of a queue with given number of paths
+        # i.e. queue_length times the size of the path expanded last (see method _get_expanded_path),
+        #   as the paths in the queue are about as long: the Path object, its list of states, and its last state
+        #   (the other states of a path are shared with its parent path)
+        path = self._get_expanded_path()
+        return queue_length * (sys.getsizeof(path) + sys.getsizeof(path.data) + sys.getsizeof(path[-1]))
+
+    def _get_expanded_path(self):
+        # returns the path expanded last, used to estimate the size of the queue
+        # overridden by the subclasses that keep it (see SearchAlgorithm)
+        return self.initial_queue[0]
+
+    _profile_nframes = 5  # number of frames stored by tracemalloc when profiling
+
+    def profile_report(self, top=10):
+        # returns string with the results of profiling (see parameter profile of the constructor):
+        # - the top functions sorted by cumulative time
+        # - the top lines of SearchExerciser's code sorted by the size of the memory allocated during the search
+        #   that is still in use at the end; allocations in other modules (e.g. numpy or the standard library)
+        #   are attributed to the last line of SearchExerciser's code that called them
+        # top is the number of functions and lines (int), default is 10
+        if self.profile_stats is None:
+            return "no profile, set profile=True and call method search"
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.add(self.profile_stats)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        lines = [stream.getvalue().rstrip(), "", f"Top {top} lines by memory allocated in search:"]
+        for (filename, lineno), (size, count) in self._memory_by_line()[:top]:
+            source = linecache.getline(filename, lineno).strip()
+            lines.append(f"{os.path.basename(filename)}:{lineno}: {size / 1024:.1f} KiB in {count} blocks: {source}")
+        return "\n".join(lines)
+
+    def _memory_by_line(self):
+        # returns list of tuples ((filename, line number), (size, count)) sorted by size
+        # each allocation is attributed to the most recent frame in SearchExerciser's code
+        package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        memory = dict()
+        for statistic in self.memory_snapshot.statistics('traceback'):
+            frame = next((frame for frame in reversed(statistic.traceback)
+                          if frame.filename.startswith(package)), statistic.traceback[-1])
+            size, count = memory.get((frame.filename, frame.lineno), (0, 0))
+            memory[(frame.filename, frame.lineno)] = (size + statistic.size, count + statistic.count)
+        return sorted(memory.items(), key=lambda item: item[1][0], reverse=True)
+
+    def dump_profile(self, filename):
+        # saves the cProfile statistics to given file in the pstats format
+        # the file can be read with pstats.Stats(filename) or tools like snakeviz
+        self.profile_stats.dump_stats(filename)
+
+    def dump_memory_snapshot(self, filename):
+        # saves the tracemalloc snapshot to given file
+        # the file can be read with tracemalloc.Snapshot.load(filename)
+        self.memory_snapshot.dump(filename)
+
+    def cancel(self):
+        # requests to stop the running search, e.g. from another thread (see method search_async)
+        # the search stops at the next iteration as if its budget is exhausted, with stop_reason "cancelled"
+        # the searches started by method run that are still running are cancelled as well
+        # the request is ignored if no search is running or about to start, so it does not stop the next search
+        with self._runs_lock:
+            if self._searching or self._start_pending:
+                self._cancel_requested = True
+            runs = list(self._runs)
+        for run in runs:
+            run.cancel()
+
+    def run(self, resume=False):
+        # performs the search on a copy of algorithm self (see method _create_run), which is left unchanged
+        # unlike method search, several calls of this method can run at the same time, e.g. in different threads,
+        #   but then each search should have its own checkpoint file, if any
+        # resume is boolean, default is False
+        #   if True, the search is resumed from self.checkpoint_file if it exists
+        # returns SearchResult object
+        run = self._create_run()
+        with self._runs_lock:
+            self._runs.add(run)
+        try:
+            run.search(resume=resume)
+        finally:
+            with self._runs_lock:
+                self._runs.discard(run)
+        return SearchResult(run)
+
+    def _create_run(self):
+        # returns copy of algorithm self to perform one search (see method run)
+        # the copy shares the configuration (e.g. the initial queue and the search budget) with algorithm self,
+        #   its state is initialized by method search
+        # extended by the subclasses that keep state between searches (see incremental.LPAS)
+        run = copy(self)
+        run._runs = set()
+        run._cancel_requested = False
+        run._searching = False
+        run._start_pending = True  # so that the search can be cancelled before it starts
+        run._profiler = None
+        return run
+
+    async def search_async(self, executor=None):
+        # performs the search without blocking the asyncio event loop
+        # the search runs in a thread of given executor (concurrent.futures.ThreadPoolExecutor),
+        #   default is None (the default executor of the event loop)
+        # if the awaiting task is cancelled, the search is cancelled (see method cancel),
+        #   after which asyncio.CancelledError is raised as soon as the search has stopped
+        # returns path_to_goal, the other result attributes are the same as after method search
+        import asyncio
+        with self._runs_lock:
+            self._cancel_requested = False
+            self._start_pending = True  # so that the search can be cancelled before the thread starts it
+        future = asyncio.get_running_loop().run_in_executor(executor, self.search)
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.cancel()
+            await asyncio.wait([future])
+            raise
+        finally:
+            with self._runs_lock:
+                self._start_pending = False  # in case the search did not start
+        return self.path_to_goal
+
+    def save_checkpoint(self, filename=None):
+        # saves the state of the search to given file, default is self.checkpoint_file
+        # paths are saved as state keys (see state_space.State.key), the problem itself is not saved,
+        #   but its fingerprint is saved to check that the search is resumed on the same problem
+        # the file is replaced atomically so that a crash cannot leave a corrupt checkpoint file
+        filename = self.checkpoint_file if filename is None else filename
+        checkpoint = dict(name=self.name, fingerprint=self._fingerprint(), state=self._checkpoint())
+        with open(filename + ".tmp", "wb") as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(filename + ".tmp", filename)
+
+    def read_checkpoint(self, filename=None):
+        # reads the state of the search from given file, default is self.checkpoint_file
+        # returns dictionary with the state, or None if the file does not exist
+        # raises ValueError if the checkpoint is saved by another algorithm or for another problem
+        filename = self.checkpoint_file if filename is None else filename
+        if filename is None or not os.path.exists(filename):
+            return None
+        with open(filename, "rb") as file:
+            checkpoint = pickle.load(file)
+        if checkpoint['name'] != self.name or checkpoint['fingerprint'] != self._fingerprint():
+            raise ValueError(f"checkpoint file {filename} is not saved by {self.name} for this problem")
+        return checkpoint['state']
+
+    def _checkpoint(self):
+        # returns dictionary with the state of the search
+        # extended by the subclasses that support checkpoints
+        return dict(nr_iterations=self.nr_iterations, queue_lengths=self.queue_lengths,
+                    elapsed_time=self._resumed_time + time() - self._starttime)
+
+    def _restore(self, state):
+        # restores the state of the search from given dictionary (see method _checkpoint)
+        self.nr_iterations = self._resumed_iterations = state['nr_iterations']
+        self.queue_lengths = state['queue_lengths']
+        self._resumed_time = state['elapsed_time']
+
+    def _save_checkpoint_if_due(self):
+        # saves checkpoint every self.checkpoint_interval iterations
+        # the checkpoint is saved by the owner if this algorithm is part of another algorithm (see blind.IDS)
+        if self.checkpoint_file is not None and self.nr_iterations % self.checkpoint_interval == 0:
+            (self._checkpoint_owner or self).save_checkpoint()
+
+    def _finish_checkpoint(self):
+        # saves checkpoint if the budget is exhausted, so that the search can be resumed
+        # removes the checkpoint file otherwise, as the search is finished
+        if self.checkpoint_file is None or self._checkpoint_owner is not None:
+            return
+        if self.budget_exhausted and not self.goal_is_reached:
+            self.save_checkpoint()
+        elif os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def _fingerprint(self):
+        # returns fingerprint of the problem (see state_space.Problem.fingerprint), or None if not implemented
+        try:
+            return self.initial_queue[0][-1].problem.fingerprint()
+        except NotImplementedError:
+            return None
+
+    def _encode_paths(self, paths):
+        # returns list of tuples (state keys, cost) for given paths
+        # the key of a state that is shared by several paths is created only once,
+        #   so that pickle stores it only once as well
+        keys = dict()  # {id(state): key}
+        encoded = []
+        for path in paths:
+            for state in path:
+                if id(state) not in keys:
+                    keys[id(state)] = state.key
+            encoded.append(([keys[id(state)] for state in path], path.cost))
+        return encoded
+
+    def _decode_paths(self, encoded):
+        # returns list of Path objects for given list of tuples (state keys, cost)
+        problem = self.initial_queue[0][-1].problem
+        return [problem._get_path(keys, cost) for keys, cost in encoded]
 
     @abstractmethod
-    def search(self):
+    def search(self, resume=False):
+        # performs the search
+        # resume is boolean, default is False: resumes the search from self.checkpoint_file if it exists
         pass
 
     def _print_result(self):
@@ -42,7 +410,13 @@ class Algorithm(ABC):
         if self.print_result:
             # 3. if (goal reached) then success else failure
             print("ALGORITHM:", self.name)
-            print("RESULT:", "SUCCES" if self.goal_is_reached else "FAILURE")
+            if self.budget_exhausted and not self.goal_is_reached:
+                if self.stop_reason == "cancelled":
+                    print("RESULT:", "CANCELLED")
+                else:
+                    print("RESULT:", "BUDGET EXHAUSTED", f"({self.stop_reason})")
+            else:
+                print("RESULT:", "SUCCES" if self.goal_is_reached else "FAILURE")
             # print elapsed time, number of iterations, and maximum length of queue
             print("Elapsed time:", self.elapsed_time, 'seconds')
             print('Number of iterations:', self.nr_iterations)
@@ -54,67 +428,138 @@ class Algorithm(ABC):
         return self.name
 
 
+class SearchResult:
+    # class that holds the result of one search performed by method Algorithm.run
+    # the attributes are the result attributes of the algorithm after the search:
+    #   path_to_goal, goal_is_reached, nr_iterations, queue_lengths, elapsed_time,
+    #   budget_exhausted, stop_reason, and best_partial_path
+    # attribute algorithm is the copy of the algorithm that performed the search,
+    #   which holds the results of specific algorithms (e.g. the solutions of optimal.ARAS) and the profile
+
+    def __init__(self, algorithm):
+        # algorithm is the Algorithm object that performed the search
+        self.algorithm = algorithm
+        self.name = algorithm.name
+        self.path_to_goal = algorithm.path_to_goal
+        self.goal_is_reached = algorithm.goal_is_reached
+        self.nr_iterations = algorithm.nr_iterations
+        self.queue_lengths = algorithm.queue_lengths
+        self.elapsed_time = algorithm.elapsed_time
+        self.budget_exhausted = algorithm.budget_exhausted
+        self.stop_reason = algorithm.stop_reason
+        self.best_partial_path = algorithm.best_partial_path
+
+    def __repr__(self):
+        # overrides inherited __repr__ method
+        # returns string
+        if self.budget_exhausted and not self.goal_is_reached:
+            result = f"stopped ({self.stop_reason})"
+        else:
+            result = "goal reached" if self.goal_is_reached else "goal not reached"
+        return f"{self.name}: {result} after {self.nr_iterations} iterations"
+
+
 class SearchAlgorithm(Algorithm):
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
+    # if True, the new paths are checked for the goal while they are created (see method _create_new_paths)
+    # subclasses that check the goal in another way (e.g. optimal.OUC) set it to False
+    _early_goal_test = True
+
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
         # initial_queue is PathSeries object
         # print_result is boolean, default is True
         # print_queue is boolean, default is False
-        super().__init__(initial_queue, print_result, print_queue)
+        # kwargs: search budget, see Algorithm
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._print_options = dict(attr=None, ndigits=1)  # print no attribute
 
     def _initialize(self):
         # initialize attributes
         # called by method search
         super()._initialize()
-        self._queue = deepcopy(self.initial_queue)
+        self._queue = self._copy_queue(self.initial_queue)
         self._queue_class = type(self.initial_queue)
         self._first_path = None
         self._new_paths = None
+        self._goal_path = None  # new path that reaches the goal, found by method _create_new_paths
+        self._goal_tested = False  # True if method _create_new_paths checked the new paths for the goal
+
+    @staticmethod
+    def _copy_queue(queue):
+        # returns deep copy of given queue (PathSeries object), but the problem of the states is not copied:
+        #   a search never changes the problem, and copying it would copy its grid or graph on each search
+        #   (e.g. a memory-mapped maze grid would be loaded into memory)
+        if len(queue) == 0 or len(queue[0]) == 0:
+            return deepcopy(queue)
+        problem = queue[0][-1].problem
+        return deepcopy(queue, {id(problem): problem})
+
+    def search(self, resume=False):
+        # performs the implemented search algorithm
+        # resume is boolean, default is False
+        #   if True, the search is resumed from self.checkpoint_file if it exists
+        self._search(self.read_checkpoint() if resume else None)
 
-    def search(self):
+    def _search(self, checkpoint=None):
         # performs the implemented search algorithm
+        # checkpoint is dictionary with the state to resume the search from (see method _checkpoint)
 
         # start time
         starttime = time()
+        self._start_budget()
+        try:
+            # initialize
+            self._initialize()
+            if checkpoint is not None:
+                self._restore(checkpoint)
+
+            # print initial queue
+            self._print_initial_queue()
 
-        # initialize
-        self._initialize()
+            # 2. while (queue is not empty and goal is not reached)
+            if checkpoint is None:
+                self.goal_is_reached = self._queue[0].reaches_goal()
+                if self.goal_is_reached:
+                    self.path_to_goal = self._queue[0]
 
-        # print initial queue
-        self._print_initial_queue()
+            while self._queue and not self.goal_is_reached:
 
-        # 2. while (queue is not empty and goal is not reached)
-        self.goal_is_reached = self._queue[0].reaches_goal()
-        if self.goal_is_reached:
-            self.path_to_goal = self._queue[0]
+                # stop if search budget is exhausted
+                if self._budget_is_exhausted(len(self._queue)):
+                    self.best_partial_path = self._get_best_partial_path()
+                    break
 
-        while self._queue and not self.goal_is_reached:
+                # augment number of iterations
+                self.nr_iterations += 1
 
-            # augment number of iterations
-            self.nr_iterations += 1
+                # length queue
+                self.queue_lengths.append(len(self._queue))
 
-            # length queue
-            self.queue_lengths.append(len(self._queue))
+                # remove the first path from the queue
+                self._remove_path_from_queue()
 
-            # remove the first path from the queue
-            self._remove_path_from_queue()
+                # create new paths (to all children)
+                # reject the new paths with loops
+                self._create_new_paths()
 
-            # create new paths (to all children)
-            # reject the new paths with loops
-            self._create_new_paths()
+                # add the new paths to the queue
+                self._add_new_paths_to_queue()
 
-            # add the new paths to the queue
-            self._add_new_paths_to_queue()
+                # print queue
+                self._print_queue()
 
-            # print queue
-            self._print_queue()
+                # update goal_is_reached
+                self._check_goal_is_reached()
 
-            # update goal_is_reached
-            self._check_goal_is_reached()
+                # save checkpoint
+                if not self.goal_is_reached:
+                    self._save_checkpoint_if_due()
 
-        # elapsed time
-        self.elapsed_time = time() - starttime
+            # elapsed time
+            self.elapsed_time = self._resumed_time + time() - starttime
+        finally:
+            self._stop_budget()
+        self._finish_checkpoint()
 
         # print path to goal
         self._print_path_to_goal()
@@ -122,6 +567,49 @@ class SearchAlgorithm(Algorithm):
         # print result
         self._print_result()
 
+    def _checkpoint(self):
+        # returns dictionary with the state of the search, including the paths in the queue
+        state = super()._checkpoint()
+        state['queue'] = self._encode_paths(self._queue)
+        return state
+
+    def _restore(self, state):
+        # restores the state of the search, including the paths in the queue
+        super()._restore(state)
+        self._queue = self._queue_class(self._decode_paths(state['queue']))
+
+    def _get_expanded_path(self):
+        # returns the path expanded last, or the first path of the initial queue before the first iteration
+        return self.initial_queue[0] if self._first_path is None else self._first_path
+
+    def _get_best_partial_path(self):
+        # returns the most promising path in the queue if the search is stopped
+        # i.e. the path with the lowest value of the attribute that is printed (see self._print_options):
+        #   heuristic h, cost c, or f-value (cost + heuristic), or the deepest path if no attribute is printed
+        paths = list(self._queue) or ([self._first_path] if self._first_path is not None else [])
+        attr = self._print_options['attr']
+        if attr == 'h':
+            return min(paths, key=lambda path: path.apply_heuristic(), default=None)
+        elif attr == 'c':
+            return min(paths, key=lambda path: path.cost, default=None)
+        elif attr == 'f':
+            return min(paths, key=lambda path: path.cost + path.apply_heuristic(), default=None)
+        return max(paths, key=len, default=None)
+
+    def _sort_by_heuristic(self, paths, add_cost=False):
+        # returns queue with given paths sorted by heuristic h, or by f-value (cost + h) if add_cost is True
+        # the heuristic of the paths that have none yet is computed in one call
+        #   (see state_space.Problem.apply_heuristic_batch) and stored in the paths,
+        #   so it is not computed again each time the queue is sorted
+        new_paths = [path for path in paths if path.heuristic is None]
+        if new_paths:
+            problem = new_paths[0][-1].problem
+            for path, h in zip(new_paths, problem.apply_heuristic_batch([path[-1] for path in new_paths])):
+                path.heuristic = h
+        if add_cost:
+            return self._queue_class(sorted(paths, key=lambda path: path.heuristic + path.cost))
+        return self._queue_class(sorted(paths, key=lambda path: path.heuristic))
+
     def _remove_path_from_queue(self):
         # removes first path from queue
         self._first_path = self._queue.pop(0)
@@ -129,8 +617,20 @@ class SearchAlgorithm(Algorithm):
     def _create_new_paths(self):
         # creates new paths to all children of first path
         # rejects the new paths with loops
-        self._new_paths = self._queue_class([path for path in self._first_path.calculate_children()
-                                             if not path.has_loop()])
+        # if self._early_goal_test is True, the new paths are checked for the goal in the same pass,
+        #   and no more children are created once the goal is reached, unless the queue is printed
+        new_paths = []
+        self._goal_path = None
+        self._goal_tested = self._early_goal_test
+        for path in self._first_path.generate_children():
+            if path.has_loop():
+                continue
+            new_paths.append(path)
+            if self._goal_tested and path.reaches_goal():
+                self._goal_path = path
+                if not self.print_queue:
+                    break
+        self._new_paths = self._queue_class(new_paths)
 
     def _add_new_paths_to_queue(self):
         # adds the new paths to the front of the queue
@@ -138,6 +638,11 @@ class SearchAlgorithm(Algorithm):
 
     def _check_goal_is_reached(self):
         # updates goal_is_reached
+        if self._goal_tested:  # new paths are already checked by method _create_new_paths
+            if self._goal_path is not None:
+                self.goal_is_reached = True
+                self.path_to_goal = self._goal_path
+            return
         for path in self._new_paths:
             if path.reaches_goal():
                 self.goal_is_reached = True
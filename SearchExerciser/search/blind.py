@@ -2,9 +2,10 @@
 # at Vives University of Applied Sciences, Kortrijk, Belgium.
 # May 2022
 from .base import Algorithm, SearchAlgorithm
+from .frontier import TreapQueue, LazyStack
 from time import time
 import numpy as np
-from random import randint
+import random
 
 
 class DFS(SearchAlgorithm):
@@ -12,19 +13,59 @@ class DFS(SearchAlgorithm):
 
     name = "Depth-first search"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False, depth_limit=np.Inf):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, depth_limit=np.Inf, lazy=False,
+                 **kwargs):
+        # depth_limit is the maximum length of the paths that are expanded, default is infinite
+        # lazy is boolean, default is False
+        #   if True, the queue is a stack of child generators (see frontier.LazyStack) instead of a list of paths,
+        #   which saves memory if states have many children; the path to goal is the same
+        #   the length of the queue is then the number of pending generators
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self.depth_limit = depth_limit
+        self.lazy = lazy
+
+    def _initialize(self):
+        # initialize attributes
+        # called by method search
+        super()._initialize()
+        self._successors = None  # new states of the path expanded last, in lazy mode (see method _create_new_paths)
+        if self.lazy:
+            self._queue = LazyStack(self._queue, self._generate_children, self._queue_class)
+
+    @staticmethod
+    def _generate_children(path, successors=None):
+        # returns generator of the children of given path without loops
+        # successors is list of tuples (new state, cost) for the last state of the path, default is None
+        #   if given, the children are created from these states instead of applying the production rules again
+        children = path.generate_children() if successors is None else \
+            (path.create_child(state, cost) for state, cost in successors)
+        return (child for child in children if not child.has_loop())
 
     def _create_new_paths(self):
         # creates new children if length of first path is smaller than depth limit
+        # in lazy mode, the children are only checked for the goal here, they are created when they are removed
+        #   from the new states, which are kept for the generator of the children (see method _add_new_paths_to_queue)
         if len(self._first_path) < self.depth_limit:  # check depth_limit
-            super()._create_new_paths()
+            if self.lazy:
+                self._new_paths = self._queue_class([])
+                self._goal_tested = True
+                self._goal_path = None
+                self._successors = self._first_path[-1].get_successors()
+                if any(state.is_goal() for state, _ in self._successors):  # only new states are created
+                    self._goal_path = next((child for child in
+                                            self._generate_children(self._first_path, self._successors)
+                                            if child.reaches_goal()), None)
+            else:
+                super()._create_new_paths()
 
     def _add_new_paths_to_queue(self):
         # adds the new paths to the FRONT of the queue
         if len(self._first_path) < self.depth_limit:  # check depth_limit
-            super()._add_new_paths_to_queue()
+            if self.lazy:
+                if self._goal_path is None:
+                    self._queue.push(self._first_path, self._generate_children(self._first_path, self._successors))
+            else:
+                super()._add_new_paths_to_queue()
 
     def _check_goal_is_reached(self):
         if len(self._first_path) < self.depth_limit:  # check depth_limit
@@ -32,7 +73,34 @@ class DFS(SearchAlgorithm):
 
     def _print_queue(self):
         if len(self._first_path) < self.depth_limit:  # check depth_limit
-            super()._print_queue()
+            if self.lazy and self.print_queue:
+                print(f"Iteration {self.nr_iterations}")
+                print("Path removed from queue:")
+                print(self._first_path.string_to_print(**self._print_options))
+                print("Next path of each pending generator in queue:")
+                print(self._queue.string_to_print(**self._print_options))
+                print()
+            else:
+                super()._print_queue()
+
+    def _checkpoint(self):
+        # returns dictionary with the state of the search
+        # in lazy mode, the expanded path and number of removed children of each pending generator are saved
+        if not self.lazy:
+            return super()._checkpoint()
+        state = Algorithm._checkpoint(self)
+        stack = self._queue.get_state()
+        paths = iter(self._encode_paths([path for path, _ in stack if path is not None]))
+        state['stack'] = [(None if path is None else next(paths), skip) for path, skip in stack]
+        return state
+
+    def _restore(self, state):
+        # restores the state of the search
+        if not self.lazy:
+            return super()._restore(state)
+        Algorithm._restore(self, state)
+        paths = iter(self._decode_paths([path for path, _ in state['stack'] if path is not None]))
+        self._queue.set_state([(None if path is None else next(paths), skip) for path, skip in state['stack']])
 
 
 class BFS(SearchAlgorithm):
@@ -40,8 +108,8 @@ class BFS(SearchAlgorithm):
 
     name = "Breadth-first search"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
 
     def _add_new_paths_to_queue(self):
         # adds the new paths to the BACK of the queue
@@ -53,15 +121,38 @@ class NDS(SearchAlgorithm):
 
     name = "Non-deterministic search"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, seed=None, **kwargs):
+        # seed is the seed of the random number generator of the search (int), default is None
+        #   if None, the seed is drawn from the global random module, so random.seed makes the search reproducible
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
+        self.seed = seed
+        self._random = None
+
+    def _initialize(self):
+        # initialize attributes
+        # called by method search
+        # the queue is a TreapQueue object, so that inserting a path in a random place takes O(log n) time
+        super()._initialize()
+        self._random = random.Random(random.getrandbits(64) if self.seed is None else self.seed)
+        self._queue = TreapQueue(self._queue, self._queue_class)
 
     def _add_new_paths_to_queue(self):
         # adds the new paths in RANDOM places in the queue
         for path in self._new_paths:
             # add child in RANDOM place in queue
-            index = randint(0, len(self._queue))  # get random index
-            self._queue.insert(index, path)
+            self._queue.insert_random(path, self._random)
+
+    def _checkpoint(self):
+        # returns dictionary with the state of the search, including the state of the random number generator
+        state = super()._checkpoint()
+        state['random_state'] = self._random.getstate()
+        return state
+
+    def _restore(self, state):
+        # restores the state of the search, including the state of the random number generator
+        super()._restore(state)
+        self._queue = TreapQueue(self._queue, self._queue_class)
+        self._random.setstate(state['random_state'])
 
 
 class IDS(Algorithm):
@@ -69,59 +160,130 @@ class IDS(Algorithm):
 
     name = "Iterative deepening search"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
-        # create DFS object for depth-limited search
-        self.__depth_limited_dfs = DFS(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, lazy=False, **kwargs):
+        # lazy is boolean, default is False
+        #   if True, the depth-limited search uses a stack of child generators (see DFS)
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
+        self.lazy = lazy
+        self.__depth_limited_dfs = None  # DFS object for depth-limited search, created by method search
         self.depth_limit = None
-
-    def search(self):
+        self._dfs_checkpoint = None  # state of the depth-limited search to resume
+        self._dfs_in_progress = False  # True if the depth-limited search with current depth limit is not finished
+
+    def _initialize(self):
+        # initialize attributes
+        # called by method search
+        # creates DFS object for depth-limited search, so that each search has its own (see base.Algorithm.run)
+        # its checkpoints are saved as part of the checkpoints of the IDS object
+        super()._initialize()
+        self.__depth_limited_dfs = DFS(self.initial_queue, self.print_result, self.print_queue, lazy=self.lazy)
+        self.__depth_limited_dfs._checkpoint_owner = self
+
+    def search(self, resume=False):
+        # resume is boolean, default is False
+        #   if True, the search is resumed from self.checkpoint_file if it exists
 
         # start time
         starttime = time()
-
-        # initialize
-        self._initialize()
-
-        # 1. DEPTH = 1
-        self.depth_limit = 1
-
-        # 2. WHILE goal is not reached
-        self.goal_is_reached = self.initial_queue[0].reaches_goal()
-        if self.goal_is_reached:
-            self.path_to_goal = self.initial_queue[0]
-
-        while not self.goal_is_reached:
-
-            # print depth limit
-            if self.print_result or self.print_queue:
-                print('--> DEPTH:', self.depth_limit)
-
-            # perform Depth-limited search
-            self.__depth_limited_dfs.depth_limit = self.depth_limit
-            self.__depth_limited_dfs.search()
-            if self.print_result or self.print_queue:
-                print()
-
-            # check if goal is reached
-            self.path_to_goal = self.__depth_limited_dfs.path_to_goal
-            self.goal_is_reached = self.path_to_goal is not None
-
-            # number of iterations
+        self._start_budget()
+        try:
+            # initialize
+            self._initialize()
+            checkpoint = self.read_checkpoint() if resume else None
+
+            # 1. DEPTH = 1
+            self.depth_limit = 1
+            self._dfs_in_progress = False
+            self._dfs_checkpoint = None
+            if checkpoint is not None:
+                self._restore(checkpoint)
+
+            # 2. WHILE goal is not reached
+            self.goal_is_reached = self.initial_queue[0].reaches_goal()
+            if self.goal_is_reached:
+                self.path_to_goal = self.initial_queue[0]
+
+            while not self.goal_is_reached:
+
+                # stop if search budget is exhausted
+                if self._budget_is_exhausted():
+                    break
+
+                # print depth limit
+                if self.print_result or self.print_queue:
+                    print('--> DEPTH:', self.depth_limit)
+
+                # perform Depth-limited search
+                # the depth-limited search gets the remaining search budget and the checkpoint settings
+                self.__depth_limited_dfs.depth_limit = self.depth_limit
+                for key, value in self._get_budget().items():
+                    setattr(self.__depth_limited_dfs, key, value)
+                self.__depth_limited_dfs.checkpoint_file = self.checkpoint_file
+                self.__depth_limited_dfs.checkpoint_interval = self.checkpoint_interval
+                self._dfs_in_progress = True
+                self.__depth_limited_dfs._search(self._dfs_checkpoint)
+                self._dfs_checkpoint = None
+                if self.print_result or self.print_queue:
+                    print()
+
+                # stop if search budget is exhausted during depth-limited search
+                # the depth-limited search is saved in the checkpoint, so it is resumed at the same depth
+                if self.__depth_limited_dfs.budget_exhausted:
+                    self.budget_exhausted = True
+                    self.stop_reason = self.__depth_limited_dfs.stop_reason
+                    self.best_partial_path = self.__depth_limited_dfs.best_partial_path
+                    break
+
+                # check if goal is reached
+                self.path_to_goal = self.__depth_limited_dfs.path_to_goal
+                self.goal_is_reached = self.path_to_goal is not None
+
+                # number of iterations
+                self.nr_iterations += self.__depth_limited_dfs.nr_iterations
+
+                # length queue
+                self.queue_lengths += self.__depth_limited_dfs.queue_lengths
+                self._dfs_in_progress = False
+
+                # DEPTH = DEPTH + 1
+                self.depth_limit += 1
+
+            # elapsed time
+            self.elapsed_time = self._resumed_time + time() - starttime
+        finally:
+            self._stop_budget()
+        self._finish_checkpoint()
+
+        # add iterations of unfinished depth-limited search
+        if self._dfs_in_progress:
             self.nr_iterations += self.__depth_limited_dfs.nr_iterations
-
-            # length queue
             self.queue_lengths += self.__depth_limited_dfs.queue_lengths
 
-            # DEPTH = DEPTH + 1
-            self.depth_limit += 1
-
-        # elapsed time
-        self.elapsed_time = time() - starttime
-
         # print result
         self._print_result()
 
+    def cancel(self):
+        # requests to stop the running search, including the running depth-limited search
+        super().cancel()
+        dfs = self.__depth_limited_dfs
+        if dfs is not None:
+            dfs.cancel()
+
+    def _checkpoint(self):
+        # returns dictionary with the state of the search:
+        #   the depth limit and the state of the unfinished depth-limited search
+        state = super()._checkpoint()
+        state['depth_limit'] = self.depth_limit
+        state['dfs'] = self.__depth_limited_dfs._checkpoint() if self._dfs_in_progress else None
+        return state
+
+    def _restore(self, state):
+        # restores the state of the search
+        # the unfinished depth-limited search is resumed in method search
+        super()._restore(state)
+        self.depth_limit = state['depth_limit']
+        self._dfs_checkpoint = state['dfs']
+
     def _print_result(self):
         if self.print_result:
             print("--> FINAL RESULT")
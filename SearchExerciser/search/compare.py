@@ -0,0 +1,117 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+from .optimal import OUC
+from .incremental import LPAS
+from time import perf_counter
+import numpy as np
+
+
+class Comparison:
+    # class that compares search algorithms on the same problems
+    # each algorithm is run repeatedly on each problem, after a number of warm-up runs,
+    # and the median and interquartile range (IQR) of the elapsed time are reported
+    # the costs of the paths found by the optimal algorithms are checked: they must be the same
+    # usage:
+    #   comparison = Comparison([BFS, (BS, dict(width=2)), OUC, AS], repeat=10)
+    #   comparison.run(maze)                                                # one problem
+    #   comparison.run([maze1, maze2])                                      # several problems
+    #   comparison.run(Maze.create_random_solvable, seeds=range(5), size=21)  # random problems
+    #   print(comparison.table())
+
+    optimal_methods = (OUC, LPAS)  # algorithms (and their subclasses) that find the path with the lowest cost
+
+    def __init__(self, methods, repeat=5, warmup=1):
+        # methods is list of search.base.Algorithm classes,
+        #   or tuples (class, dictionary with parameters), e.g. (BS, dict(width=2))
+        # repeat is the number of timed runs per algorithm and problem (int), default is 5
+        # warmup is the number of runs before the timed runs (int), default is 1
+        self.methods = [method if isinstance(method, tuple) else (method, dict()) for method in methods]
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results = []  # list of dictionaries with the result for each problem and algorithm
+        self.mismatches = []  # list of problem names for which the optimal algorithms found different costs
+
+    def run(self, problems, seeds=None, print_result=True, **kwargs):
+        # runs all algorithms on given problems
+        # problems is a state_space.Problem object or a list of Problem objects,
+        #   or a function that creates a Problem object (e.g. Maze.create_random_solvable) if seeds is given
+        # seeds is list of random seeds, default is None
+        #   if given, problems(seed=seed, **kwargs) is called for each seed
+        # print_result is boolean, default is True: prints the comparison table
+        # returns list of dictionaries with the results (see attribute results)
+        if seeds is not None:
+            problems = [(f"seed {seed}", problems(seed=seed, **kwargs)) for seed in seeds]
+        elif isinstance(problems, (list, tuple)):
+            problems = [(f"{type(problem).__name__} {i}", problem) for i, problem in enumerate(problems)]
+        else:
+            problems = [(type(problems).__name__, problems)]
+        results = []
+        for name, problem in problems:
+            results.extend(self._run_problem(name, problem))
+        self.results.extend(results)
+        if print_result:
+            print(self.table(results))
+        return results
+
+    def _run_problem(self, name, problem):
+        # runs all algorithms on given problem
+        # returns list of dictionaries with the results
+        # each algorithm is created once, each run is a separate search (see search.base.Algorithm.run)
+        results = []
+        for Method, kwargs in self.methods:
+            method = problem.create_algorithm(Method, print_result=False, **kwargs)
+            for _ in range(self.warmup):
+                method.run()
+            times = []
+            for _ in range(self.repeat):
+                start = perf_counter()
+                result = method.run()
+                times.append(perf_counter() - start)
+            q25, q50, q75 = np.percentile(times, [25, 50, 75])
+            path = result.path_to_goal
+            results.append(dict(problem=name, name=method.name,
+                                optimal=issubclass(Method, self.optimal_methods),
+                                median_time=q50, iqr_time=q75 - q25,
+                                nr_iterations=result.nr_iterations,
+                                max_queue_length=max(result.queue_lengths),
+                                goal_is_reached=result.goal_is_reached,
+                                cost=None if path is None else path.cost,
+                                cost_agrees=None))
+        self._check_costs(name, results)
+        return results
+
+    def _check_costs(self, name, results):
+        # checks if all optimal algorithms found a path with the same cost
+        # sets key 'cost_agrees' of the results of the optimal algorithms
+        costs = [result['cost'] for result in results if result['optimal']]
+        if all(cost is None for cost in costs):  # also if there are no optimal algorithms
+            agrees = True
+        else:
+            agrees = None not in costs and bool(np.allclose(costs, costs[0]))
+        for result in results:
+            if result['optimal']:
+                result['cost_agrees'] = agrees
+        if not agrees:
+            self.mismatches.append(name)
+
+    def table(self, results=None):
+        # returns string with comparison table of given results, default is all results
+        # the optimal algorithms are marked with "ok" if their costs agree, "MISMATCH" otherwise
+        results = self.results if results is None else results
+        header = f"{'problem':12s} {'algorithm':40s} {'median (ms)':>12s} {'IQR (ms)':>10s} " \
+                 f"{'iterations':>11s} {'max queue':>10s} {'cost':>8s}  optimal"
+        lines = [header, "-" * len(header)]
+        for result in results:
+            cost = "-" if result['cost'] is None else f"{result['cost']:.1f}"
+            check = "" if result['cost_agrees'] is None else ("ok" if result['cost_agrees'] else "MISMATCH")
+            lines.append(f"{result['problem']:12s} {result['name']:40s} {1000 * result['median_time']:12.3f} "
+                         f"{1000 * result['iqr_time']:10.3f} {result['nr_iterations']:11d} "
+                         f"{result['max_queue_length']:10d} {cost:>8s}  {check}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        # overrides inherited __repr__ method
+        # returns string
+        names = ", ".join(Method.__name__ for Method, _ in self.methods)
+        return f"Comparison([{names}], repeat={self.repeat}, warmup={self.warmup})"
@@ -0,0 +1,339 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+from random import Random
+import heapq
+import math
+
+
+class _Node:
+    # node of a TreapQueue object
+
+    __slots__ = ('path', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, path, priority):
+        self.path = path
+        self.priority = priority
+        self.size = 1  # number of nodes in subtree
+        self.left = None
+        self.right = None
+
+    def update(self):
+        # recalculates size of subtree
+        self.size = 1 + (self.left.size if self.left else 0) + (self.right.size if self.right else 0)
+
+
+class TreapQueue:
+    # class that implements a queue of paths as an implicit treap:
+    #   a binary tree ordered by position in the queue, balanced by random node priorities
+    # inserting and removing a path at any position takes O(log n) time instead of O(n) for a list
+    # used by blind.NDS, which inserts the new paths in random places in the queue
+
+    def __init__(self, paths=(), series_class=list):
+        # paths is iterable with the initial paths in the queue, default is empty
+        # series_class is the class to convert the queue to (e.g. state_space.PathSeries), default is list
+        self._series_class = series_class
+        self._priorities = Random(0)  # the priorities only balance the tree, they do not affect the order
+        self._root = None
+        for path in paths:
+            self.append(path)
+
+    def __len__(self):
+        return self._root.size if self._root else 0
+
+    def __iter__(self):
+        # iterates over the paths from front to back
+        stack, node = [], self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.path
+            node = node.right
+
+    def __getitem__(self, index):
+        # returns path at given index (int)
+        index = self.__check_index(index, len(self))
+        node = self._root
+        while True:
+            left_size = node.left.size if node.left else 0
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.path
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def insert(self, index, path):
+        # inserts path before given index (int)
+        # descends until a node with lower priority is found, which is split into the children of the new node
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        node = _Node(path, self._priorities.random())
+        parent, is_left, current = None, False, self._root
+        while current is not None and current.priority > node.priority:
+            current.size += 1
+            left_size = current.left.size if current.left else 0
+            parent = current
+            if index <= left_size:
+                is_left, current = True, current.left
+            else:
+                index -= left_size + 1
+                is_left, current = False, current.right
+        node.left, node.right = self.__split(current, index)
+        node.update()
+        self.__replace_child(parent, is_left, node)
+
+    def insert_random(self, path, rng):
+        # inserts path in random place in queue, every place has the same probability
+        # rng is random.Random object
+        self.insert(rng.randint(0, len(self)), path)
+
+    def append(self, path):
+        # adds path to the back of the queue
+        self.insert(len(self), path)
+
+    def pop(self, index=0):
+        # removes and returns path at given index (int), default is 0 (the front of the queue)
+        # descends to the node, which is replaced by the merge of its children
+        index = self.__check_index(index, len(self))
+        parent, is_left, current = None, False, self._root
+        while True:
+            current.size -= 1
+            left_size = current.left.size if current.left else 0
+            if index == left_size:
+                break
+            parent = current
+            if index < left_size:
+                is_left, current = True, current.left
+            else:
+                index -= left_size + 1
+                is_left, current = False, current.right
+        self.__replace_child(parent, is_left, self.__merge(current.left, current.right))
+        return current.path
+
+    def string_to_print(self, **kwargs):
+        # returns string to print queue (see state_space.PathSeries.string_to_print)
+        return self._series_class(self).string_to_print(**kwargs)
+
+    def __repr__(self):
+        return repr(self._series_class(self))
+
+    def __replace_child(self, parent, is_left, node):
+        # sets node as left or right child of parent, or as root if parent is None
+        if parent is None:
+            self._root = node
+        elif is_left:
+            parent.left = node
+        else:
+            parent.right = node
+
+    @staticmethod
+    def __check_index(index, length):
+        # returns non-negative index, raises IndexError if index is out of range
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("queue index out of range")
+        return index
+
+    @classmethod
+    def __split(cls, node, index):
+        # splits subtree into the nodes before given index and the nodes from index on
+        # returns tuple with the roots of both subtrees
+        if node is None:
+            return None, None
+        left_size = node.left.size if node.left else 0
+        if index <= left_size:
+            left, node.left = cls.__split(node.left, index)
+            node.update()
+            return left, node
+        node.right, right = cls.__split(node.right, index - left_size - 1)
+        node.update()
+        return node, right
+
+    @classmethod
+    def __merge(cls, left, right):
+        # merges two subtrees, all nodes of left subtree come before the nodes of right subtree
+        # returns root of merged tree
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = cls.__merge(left.right, right)
+            left.update()
+            return left
+        right.left = cls.__merge(left, right.left)
+        right.update()
+        return right
+
+
+class LazyStack:
+    # class that implements the queue of depth-first search as a stack of child generators
+    # each entry holds an expanded path, a generator of its children, and the next child
+    # so the queue only stores one pending generator per depth instead of all children of all expanded paths
+    # the paths are removed from the queue in the same order as in the queue of blind.DFS
+    # used by blind.DFS with lazy=True
+
+    def __init__(self, paths, children, series_class=list):
+        # paths is iterable with the initial paths in the queue
+        # children is function that returns an iterator over the children of a path
+        # series_class is the class to convert the queue to (e.g. state_space.PathSeries), default is list
+        self._paths = list(paths)
+        self._children = children
+        self._series_class = series_class
+        self._entries = []  # list of entries [path, iterator, number of children taken, next child]
+        self.__add_entry(None, 0)  # entry without path for the initial paths
+
+    def __len__(self):
+        # returns number of pending generators
+        return len(self._entries)
+
+    def __iter__(self):
+        # iterates over the next child of each pending generator, from front to back
+        for entry in reversed(self._entries):
+            yield entry[3]
+
+    def __getitem__(self, index):
+        # returns path at front of the queue, only index 0 is supported
+        if index != 0 or not self._entries:
+            raise IndexError("only the first path in the queue is available")
+        return self._entries[-1][3]
+
+    def pop(self, index=0):
+        # removes and returns path at front of the queue, only index 0 is supported
+        path = self[index]
+        entry = self._entries[-1]
+        if not self.__advance(entry):
+            self._entries.pop()
+        return path
+
+    def push(self, path, children=None):
+        # adds the children of given path to the front of the queue
+        # children is iterator over the children of the path, default is None: the function given to the constructor
+        #   is called to create it
+        self.__add_entry(path, 0, children)
+
+    def get_state(self):
+        # returns list of tuples (path, number of children removed from the queue) for each pending generator
+        # path is None for the initial paths
+        return [(entry[0], entry[2] - 1) for entry in self._entries]
+
+    def set_state(self, state):
+        # restores the pending generators from given list (see method get_state)
+        self._entries = []
+        for path, skip in state:
+            self.__add_entry(path, skip)
+
+    def string_to_print(self, **kwargs):
+        # returns string to print queue (see state_space.PathSeries.string_to_print)
+        return self._series_class(self).string_to_print(**kwargs)
+
+    def __repr__(self):
+        return repr(self._series_class(self))
+
+    def __add_entry(self, path, skip, iterator=None):
+        # adds entry for given path, skipping the given number of children
+        # iterator is iterator over the children of the path, default is None (see method push)
+        # the entry is not added if there are no children left
+        if iterator is None:
+            iterator = iter(self._paths) if path is None else self._children(path)
+        for _ in range(skip):
+            next(iterator)
+        entry = [path, iterator, skip, None]
+        if self.__advance(entry):
+            self._entries.append(entry)
+
+    @staticmethod
+    def __advance(entry):
+        # takes the next child of entry
+        # returns False if there are no children left
+        entry[3] = next(entry[1], None)
+        if entry[3] is None:
+            return False
+        entry[2] += 1
+        return True
+
+
+class BoundedHeapQueue:
+    # class that implements a queue of paths as a binary heap ordered by a key (e.g. the accumulated cost)
+    # paths with a key greater than an upper bound are pruned:
+    #   new paths are rejected, paths already in the heap are discarded lazily when they reach the top
+    # paths with the same key are removed in the same order as from a list that is sorted with a stable sort
+    #   after each batch of new paths is added to its front (see optimal.UC), i.e. the most recent batch first
+    # adding a batch of k paths takes O(k log n) time instead of O(n log n) to sort the list
+    # used by optimal.BBUC
+
+    def __init__(self, paths=(), key=None, series_class=list):
+        # paths is iterable with the initial paths in the queue, default is empty
+        # key is function that returns the key of a path, default is None: the path itself
+        # series_class is the class to convert the queue to (e.g. state_space.PathSeries), default is list
+        self._key = (lambda path: path) if key is None else key
+        self._series_class = series_class
+        self._heap = []  # list of items (key, -batch number, index in batch, path)
+        self._nr_of_batches = 0
+        self._nr_above_bound = 0  # number of items in the heap with key greater than the bound
+        self.bound = math.inf  # upper bound of the keys of the paths in the queue
+        self.nr_pruned = 0  # number of paths that are pruned
+        self.push(paths)
+
+    def __len__(self):
+        return len(self._heap) - self._nr_above_bound
+
+    def __iter__(self):
+        # iterates over the paths from front to back
+        # sorts the heap, so takes O(n log n) time
+        return (item[3] for item in sorted(self._heap) if item[0] <= self.bound)
+
+    def __getitem__(self, index):
+        # returns path at front of the queue, only index 0 is supported
+        self.__discard_pruned()
+        if index != 0 or not self._heap:
+            raise IndexError("only the first path in the queue is available")
+        return self._heap[0][3]
+
+    def pop(self, index=0):
+        # removes and returns path at front of the queue, only index 0 is supported
+        path = self[index]
+        heapq.heappop(self._heap)
+        return path
+
+    def push(self, paths):
+        # adds batch of paths to the queue, paths with key greater than the bound are rejected
+        # returns list of rejected paths
+        batch = -self._nr_of_batches
+        self._nr_of_batches += 1
+        rejected = []
+        for index, path in enumerate(paths):
+            key = self._key(path)
+            if key > self.bound:
+                rejected.append(path)
+            else:
+                heapq.heappush(self._heap, (key, batch, index, path))
+        self.nr_pruned += len(rejected)
+        return rejected
+
+    def prune(self, bound):
+        # lowers the bound to given value, the paths with greater key are pruned
+        # the paths are not removed from the heap, they are only counted
+        if bound < self.bound:
+            self.bound = bound
+            nr_above_bound = sum(1 for item in self._heap if item[0] > bound)
+            self.nr_pruned += nr_above_bound - self._nr_above_bound
+            self._nr_above_bound = nr_above_bound
+
+    def string_to_print(self, **kwargs):
+        # returns string to print queue (see state_space.PathSeries.string_to_print)
+        return self._series_class(self).string_to_print(**kwargs)
+
+    def __repr__(self):
+        return repr(self._series_class(self))
+
+    def __discard_pruned(self):
+        # removes the pruned paths from the top of the heap
+        # these are the paths with the greatest keys, so they only reach the top if no other paths are left
+        while self._heap and self._heap[0][0] > self.bound:
+            heapq.heappop(self._heap)
+            self._nr_above_bound -= 1
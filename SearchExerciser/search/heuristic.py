@@ -7,8 +7,8 @@ from .base import SearchAlgorithm
 class HeuristicSearchAlgorithm(SearchAlgorithm):
     # superclass for heuristic search algorithms
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._print_options = dict(attr='h', ndigits=1)  # also print heuristic h
 
 
@@ -17,13 +17,13 @@ class HC(HeuristicSearchAlgorithm):
 
     name = 'Hill Climbing'
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
 
     def _add_new_paths_to_queue(self):
         # sorts the new paths using heuristic f
         # adds the sorted new paths to the front of the queue
-        self._new_paths = self._queue_class(sorted(self._new_paths, key=lambda path: path.apply_heuristic()))
+        self._new_paths = self._sort_by_heuristic(self._new_paths)
         super()._add_new_paths_to_queue()
 
 
@@ -32,14 +32,14 @@ class GS(HeuristicSearchAlgorithm):
 
     name = "Greedy search"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
 
     def _add_new_paths_to_queue(self):
         # adds the new paths to the front of the queue
         # sorts the entire queue using heuristic f
         super()._add_new_paths_to_queue()
-        self._queue = self._queue_class(sorted(self._queue, key=lambda path: path.apply_heuristic()))
+        self._queue = self._sort_by_heuristic(self._queue)
 
 
 class BS(HeuristicSearchAlgorithm):
@@ -47,8 +47,8 @@ class BS(HeuristicSearchAlgorithm):
 
     name = "Beam search"
 
-    def __init__(self, initial_queue, width, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, width, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self.width = width
 
     def _remove_path_from_queue(self):
@@ -63,7 +63,7 @@ class BS(HeuristicSearchAlgorithm):
     def _add_new_paths_to_queue(self):
         # sorts the new paths by heuristic f
         # adds the width best new paths to the queue
-        self._new_paths = self._queue_class(sorted(self._new_paths, key=lambda path: path.apply_heuristic()))
+        self._new_paths = self._sort_by_heuristic(self._new_paths)
         if len(self._new_paths) > self.width:
             self._new_paths = self._new_paths[:self.width]
         self._queue = self._new_paths
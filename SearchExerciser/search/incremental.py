@@ -0,0 +1,205 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+from .base import Algorithm
+from time import time
+import numpy as np
+import heapq
+
+
+class LPAS(Algorithm):
+    # class that implements Lifelong Planning A* (LPA*)
+    # LPA* is an incremental version of A*:
+    #   after the problem changes (e.g. maze cells that become walls or free cells),
+    #   the previous search result is repaired instead of searching again from scratch
+    # usage:
+    #   planner = maze.create_algorithm(LPAS)
+    #   planner.search()                                  # first search
+    #   planner.update(maze.update_cells({(2, 3): 2}))    # close cell (2, 3)
+    #   planner.search()                                  # repair, re-expands only the affected states
+    # method update must not be called while searches started by method run are running
+    # states must be hashable and moves must be reversible with the same cost (which is the case for mazes and graphs)
+    # the heuristic must be consistent (e.g. the Manhattan distance in a maze)
+
+    name = "Lifelong planning A*"
+    _supports_checkpoints = False
+
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
+        self._start = initial_queue[0][-1]
+        self._goal = None  # goal state, known as soon as it is encountered
+        self._g = None  # dictionary {state: g-value}, None if first search is not performed yet
+        self._rhs = None  # dictionary {state: one-step lookahead g-value}
+        self._open = None  # dictionary {state: key} of the inconsistent states in the priority queue
+        self._heap = None  # priority queue with items (key, counter, state), outdated items are skipped
+        self._counter = 0
+        self.nr_reexpansions = 0  # number of states expanded to repair the previous result
+
+    def search(self, resume=False):
+        # resume is boolean, default is False
+        #   it has no effect, as LPA* does not support checkpoints (see base.Algorithm),
+        #   but a search that is stopped because its budget is exhausted is continued by the next search
+
+        # start time
+        starttime = time()
+        self._start_budget()
+        try:
+            # initialize
+            repair = self._g is not None
+            self._initialize()
+            if not repair:
+                self._initialize_planner()
+
+            # expand inconsistent states until the goal is consistent
+            self._compute_shortest_path()
+            self.nr_reexpansions = self.nr_iterations if repair else 0
+
+            # extract path to goal
+            # if the search budget is exhausted, the next call of search continues the search
+            if not self.budget_exhausted and self._goal is not None and self._get_g(self._goal) < np.inf:
+                self.goal_is_reached = True
+                self.path_to_goal = self._extract_path()
+
+            # elapsed time
+            self.elapsed_time = time() - starttime
+        finally:
+            self._stop_budget()
+
+        # print result
+        self._print_result()
+
+    def _create_run(self):
+        # returns copy of planner self to perform one search (see base.Algorithm.run)
+        # the copy continues from the result of the last search of planner self, e.g. to repair the path to goal,
+        #   but its search does not change the state of planner self
+        run = super()._create_run()
+        if self._g is not None:
+            run._g, run._rhs, run._open, run._heap = dict(self._g), dict(self._rhs), dict(self._open), list(self._heap)
+        return run
+
+    def update(self, states):
+        # notifies the planner that the given states are changed
+        # states is a list of State objects, e.g. returned by maze.Maze.update_cells
+        # the edges to and from these states are updated, the next call of search repairs the path to goal
+        if self._g is None:
+            return  # nothing to repair yet
+        for state in states:
+            self._update_state(state)
+            for neighbor, _ in self._successors(state):
+                self._update_state(neighbor)
+
+    def _initialize_planner(self):
+        # initializes g-values, rhs-values and priority queue
+        self._g, self._rhs, self._open, self._heap = dict(), {self._start: 0.0}, dict(), []
+        self._goal = self._start if self._start.is_goal() else None
+        self._push(self._start)
+
+    def _compute_shortest_path(self):
+        # expands inconsistent states in order of their key
+        # until the goal state is consistent and its key is not larger than the smallest key in the queue
+        while self._open:
+            top = self._top_key()
+            if self._goal is not None and top >= self._key(self._goal) and \
+                    self._get_rhs(self._goal) == self._get_g(self._goal):
+                break
+            if self._budget_is_exhausted(len(self._open)):
+                break
+            _, _, state = heapq.heappop(self._heap)
+            del self._open[state]
+            self.nr_iterations += 1
+            self.queue_lengths.append(len(self._open))
+            if self._get_g(state) > self._get_rhs(state):  # overconsistent: state gets its new g-value
+                self._g[state] = self._get_rhs(state)
+                for successor, _ in self._successors(state):
+                    self._update_state(successor)
+            else:  # underconsistent: state's g-value is invalidated
+                self._g[state] = np.inf
+                self._update_state(state)
+                for successor, _ in self._successors(state):
+                    self._update_state(successor)
+            self._print_expansion(state)
+
+    def _update_state(self, state):
+        # recalculates rhs-value of given state and (re)inserts it into the priority queue if it is inconsistent
+        if self._goal is None and state.is_goal():
+            self._goal = state
+        if state != self._start:
+            self._rhs[state] = min([self._get_g(predecessor) + cost
+                                    for predecessor, cost in self._predecessors(state)], default=np.inf)
+        self._open.pop(state, None)
+        if self._get_g(state) != self._get_rhs(state):
+            self._push(state)
+
+    def _push(self, state):
+        # adds state to priority queue
+        key = self._key(state)
+        self._open[state] = key
+        heapq.heappush(self._heap, (key, self._counter, state))
+        self._counter += 1
+
+    def _top_key(self):
+        # returns smallest key in priority queue, skipping outdated items
+        while self._heap:
+            key, _, state = self._heap[0]
+            if self._open.get(state) == key:
+                return key
+            heapq.heappop(self._heap)
+        return np.inf, np.inf
+
+    def _key(self, state):
+        # returns key (tuple) of given state
+        g = min(self._get_g(state), self._get_rhs(state))
+        return g + state.apply_heuristic(), g
+
+    def _get_g(self, state):
+        return self._g.get(state, np.inf)
+
+    def _get_rhs(self, state):
+        return self._rhs.get(state, np.inf)
+
+    @staticmethod
+    def _successors(state):
+        # returns list of tuples (new state, cost) for all valid moves from given state
+        return state.get_successors()
+
+    def _predecessors(self, state):
+        # returns list of tuples (previous state, cost) for all valid moves to given state
+        # moves are assumed to be reversible, so the candidates are the neighbors of the state,
+        # but the move back to the state must be valid (e.g. it is not valid if the state is a wall)
+        predecessors = []
+        for neighbor, _ in self._successors(state):
+            for successor, cost in self._successors(neighbor):
+                if successor == state:
+                    predecessors.append((neighbor, cost))
+                    break
+        return predecessors
+
+    def _extract_path(self):
+        # follows the predecessors with the smallest g-value plus cost from goal back to start
+        # returns Path object
+        states = [self._goal]
+        while states[-1] != self._start:
+            g, _, state = min([(self._get_g(predecessor) + cost, i, predecessor)
+                               for i, (predecessor, cost) in enumerate(self._predecessors(states[-1]))])
+            states.append(state)
+        path = type(self.initial_queue[0])(states[::-1])
+        path.cost = self._get_g(self._goal)
+        return path
+
+    def _print_expansion(self, state):
+        # prints expanded state
+        # if self.print_queue is True
+        if self.print_queue:
+            print(f"Iteration {self.nr_iterations}")
+            print("State expanded:", state, f"(g={self._get_g(state):.1f}, rhs={self._get_rhs(state):.1f})")
+            print("Number of inconsistent states in queue:", len(self._open))
+            print()
+
+    def _print_result(self):
+        # prints result
+        # if self.print_result is True
+        if self.print_result:
+            super()._print_result()
+            print('Number of re-expanded states:', self.nr_reexpansions)
+            if self.path_to_goal is not None:
+                print('Accumulated cost of path to goal:', self.path_to_goal.cost)
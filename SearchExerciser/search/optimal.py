@@ -1,9 +1,12 @@
 # SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
 # at Vives University of Applied Sciences, Kortrijk, Belgium.
 # May 2022
-from .base import SearchAlgorithm
+from .base import Algorithm, SearchAlgorithm
+from .frontier import BoundedHeapQueue
 import numpy as np
 from itertools import permutations
+from time import time
+import heapq
 
 
 class UC(SearchAlgorithm):
@@ -11,8 +14,8 @@ class UC(SearchAlgorithm):
 
     name = "Uniform cost"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._print_options = dict(attr='c', ndigits=1)  # also print cost c
 
     def _add_new_paths_to_queue(self):
@@ -35,8 +38,10 @@ class OUC(UC):
 
     name = "Optimal uniform cost"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    _early_goal_test = False  # the goal is only reached if the path to goal is the first path in the queue
+
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
 
     def _check_goal_is_reached(self):
         # updates goal_is_reached
@@ -47,32 +52,56 @@ class OUC(UC):
 
 class BBUC(OUC):
     # class that implements branch-and-bound extended uniform cost
+    # the queue is a frontier.BoundedHeapQueue object: a heap ordered by accumulated cost,
+    #   so that the queue is not sorted again in each iteration, and paths with cost greater than
+    #   the upper bound are pruned lazily; nr_pruned is the number of pruned paths
 
     name = "Branch-and-bound extended uniform cost"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._bound = np.Inf
         self._pruned = None
+        self.nr_pruned = 0
 
     def _initialize(self):
         # initialize attributes
         # called by method search
         super()._initialize()
         self._bound = np.Inf
+        self._pruned = None
+        self.nr_pruned = 0
+        self._queue = BoundedHeapQueue(self._queue, lambda path: path.cost, self._queue_class)
+
+    def _checkpoint(self):
+        # returns dictionary with the state of the search, including the upper bound
+        state = super()._checkpoint()
+        state['bound'] = self._bound
+        state['nr_pruned'] = self.nr_pruned
+        return state
+
+    def _restore(self, state):
+        # restores the state of the search, including the upper bound
+        super()._restore(state)
+        self._bound = state['bound']
+        self._queue = BoundedHeapQueue(self._queue, lambda path: path.cost, self._queue_class)
+        self._queue.prune(self._bound)
+        self._queue.nr_pruned = self.nr_pruned = state.get('nr_pruned', 0)
 
     def _add_new_paths_to_queue(self):
-        # adds the new paths to the front of the queue
-        # sorts the entire queue by accumulated cost
+        # adds the new paths to the queue, which is ordered by accumulated cost
         # updates the upper bound
-        # removes paths from the queue with cost greater than the upper bound
-        super()._add_new_paths_to_queue()
+        # prunes paths from the queue with cost greater than the upper bound
+        # the pruned paths are only collected if the queue is printed
         for path in self._new_paths:
             if path.reaches_goal():
                 self._bound = min(path.cost, self._bound)
+        rejected = self._queue.push(self._new_paths)
         if self.print_queue:
-            self._pruned = self._queue_class(filter(lambda path: path.cost > self._bound, self._queue))
-        self._queue = self._queue_class(filter(lambda path: path.cost <= self._bound, self._queue))
+            pruned = [path for path in self._queue if path.cost > self._bound]
+            self._pruned = self._queue_class(sorted(rejected + pruned, key=lambda path: path.cost))
+        self._queue.prune(self._bound)
+        self.nr_pruned = self._queue.nr_pruned
 
     def _print_queue(self):
         # prints queue
@@ -96,15 +125,15 @@ class EEUC(OUC):
 
     name = "Estimate extended uniform cost"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._print_options = dict(attr='f', ndigits=1)  # also print f-value
 
     def _add_new_paths_to_queue(self):
         # adds the new paths to the front of the queue
         # sorts the entire queue by f-value (= accumulated cost + heuristic h)
         SearchAlgorithm._add_new_paths_to_queue(self)
-        self._queue = self._queue_class(sorted(self._queue, key=lambda path: path.apply_heuristic() + path.cost))
+        self._queue = self._sort_by_heuristic(self._queue, add_cost=True)
 
 
 class AS(EEUC):
@@ -112,8 +141,8 @@ class AS(EEUC):
 
     name = "A*"
 
-    def __init__(self, initial_queue, print_result=True, print_queue=False):
-        super().__init__(initial_queue, print_result, print_queue)
+    def __init__(self, initial_queue, print_result=True, print_queue=False, **kwargs):
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
         self._redundant = None
 
     def _add_new_paths_to_queue(self):
@@ -145,3 +174,163 @@ class AS(EEUC):
             print("Paths in queue:")
             print(self._queue.string_to_print(**self._print_options))
             print()
+
+
+class ARAS(Algorithm):
+    # class that implements anytime repairing A* (ARA*)
+    # ARA* quickly finds a first path using weighted A*, with f-value = cost + weight * heuristic h,
+    # and improves it as long as the budget allows by decreasing the weight and repairing the search
+    # the queue (frontier) is reused between rounds, states whose cost improved after being expanded
+    # are put back in the queue at the start of the next round
+    # each path found is at most bound times as costly as the optimal path
+    # the heuristic must be admissible, states must be hashable
+
+    name = "Anytime repairing A*"
+    _supports_checkpoints = False
+
+    def __init__(self, initial_queue, print_result=True, print_queue=False,
+                 weight=3.0, weight_step=0.5, callback=None, **kwargs):
+        # weight is the initial weight of the heuristic (float >= 1), default is 3
+        # weight_step is the decrease of the weight after each round (float), default is 0.5
+        # callback is a function called with arguments (path, bound) each time a better path is found
+        # kwargs: search budget (e.g. max_time in seconds), see base.Algorithm
+        #   if the budget is exhausted, path_to_goal is the best path found so far
+        super().__init__(initial_queue, print_result, print_queue, **kwargs)
+        self.weight = weight
+        self.weight_step = weight_step
+        self.callback = callback
+        self.solutions = []  # list of tuples (path, bound) with the successive paths found
+        self.bound = np.inf  # suboptimality bound of self.path_to_goal
+
+    def _initialize(self):
+        # initialize attributes
+        # called by method search
+        super()._initialize()
+        self.solutions = []
+        self.bound = np.inf
+        self._weight = self.weight  # weight in current round
+        self._completed_weight = np.inf  # weight of last completed round
+        self._g = dict()  # {state: cost of cheapest path to state}
+        self._open = dict()  # {state: cheapest path to state in queue}
+        self._heap = []  # queue with items (f-value, counter, path), outdated items are skipped
+        self._closed = set()  # states expanded in current round
+        self._incons = dict()  # {state: path} for improved states that were expanded already
+        self._counter = 0
+
+    def search(self, resume=False):
+        # resume is boolean, default is False
+        #   it has no effect, as ARA* does not support checkpoints (see base.Algorithm)
+
+        # start time
+        starttime = time()
+        self._start_budget()
+        try:
+            # initialize
+            self._initialize()
+            for path in self.initial_queue:
+                if path.reaches_goal():
+                    self._update_solution(path)
+                self._add(path)
+
+            # rounds of weighted A* with decreasing weight
+            while not self._budget_is_exhausted(len(self._open)):
+                if self._improve_path():
+                    self._completed_weight = self._weight
+                self._update_bound()
+                if self.print_queue:
+                    print(f"Weight {self._weight}: cost {self._cost():.1f}, bound {self.bound:.2f}")
+                if self.bound <= 1 or not (self._open or self._incons):
+                    break  # optimal path found
+                self._weight = max(1.0, self._weight - self.weight_step)
+                self._reorder_queue()
+            self._update_bound()
+
+            # elapsed time
+            self.elapsed_time = time() - starttime
+        finally:
+            self._stop_budget()
+
+        # print result
+        self._print_result()
+
+    def _improve_path(self):
+        # performs weighted A* until the path to goal cannot be improved with the current weight
+        # returns True if the round is completed, False if the budget is exhausted
+        while self._heap and self._heap[0][0] < self._cost():
+            if self._budget_is_exhausted(len(self._open)):
+                return False
+            _, _, path = heapq.heappop(self._heap)
+            state = path[-1]
+            if self._open.get(state) is not path:
+                continue  # outdated item
+            del self._open[state]
+            self._closed.add(state)
+            self.nr_iterations += 1
+            self.queue_lengths.append(len(self._open))
+            for child in path.calculate_children():
+                new_state = child[-1]
+                if child.cost < self._g.get(new_state, np.inf):
+                    if new_state.is_goal():
+                        self._g[new_state] = child.cost
+                        self._update_solution(child)
+                    elif new_state in self._closed:
+                        self._g[new_state] = child.cost
+                        self._incons[new_state] = child
+                    else:
+                        self._add(child)
+        return True
+
+    def _add(self, path):
+        # adds path to queue
+        self._g[path[-1]] = path.cost
+        self._open[path[-1]] = path
+        heapq.heappush(self._heap, (self._f(path), self._counter, path))
+        self._counter += 1
+
+    def _reorder_queue(self):
+        # moves the inconsistent states to the queue
+        # recalculates the f-values with the new weight and starts new round
+        self._open.update(self._incons)
+        self._incons = dict()
+        self._closed = set()
+        self._heap = [(self._f(path), i, path) for i, path in enumerate(self._open.values())]
+        heapq.heapify(self._heap)
+        self._counter = len(self._heap)
+
+    def _f(self, path):
+        # returns weighted f-value of path
+        return path.cost + self._weight * path.apply_heuristic()
+
+    def _cost(self):
+        # returns cost of current path to goal (infinity if no path is found yet)
+        return np.inf if self.path_to_goal is None else self.path_to_goal.cost
+
+    def _update_solution(self, path):
+        # stores better path to goal
+        self.path_to_goal = path
+        self.goal_is_reached = True
+        self._update_bound()
+        self.solutions.append((path, self.bound))
+        if self.callback is not None:
+            self.callback(path, self.bound)
+
+    def _update_bound(self):
+        # updates suboptimality bound: cost of path to goal divided by a lower bound of the optimal cost
+        # the lower bound is the smallest f-value (without weight) of the paths in the queue and inconsistent paths
+        # the bound cannot be larger than the weight of the last completed round
+        if self.path_to_goal is None:
+            self.bound = np.inf
+            return
+        paths = list(self._open.values()) + list(self._incons.values())
+        lower_bound = min([path.cost + path.apply_heuristic() for path in paths], default=self._cost())
+        bound = self._cost() / lower_bound if lower_bound > 0 else 1.0
+        self.bound = max(1.0, min(self._completed_weight, bound))
+
+    def _print_result(self):
+        # prints result
+        # if self.print_result is True
+        if self.print_result:
+            super()._print_result()
+            if self.path_to_goal is not None:
+                print('Accumulated cost of path to goal:', self.path_to_goal.cost)
+                print('Suboptimality bound:', self.bound)
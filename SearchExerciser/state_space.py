@@ -2,7 +2,7 @@
 # at Vives University of Applied Sciences, Kortrijk, Belgium.
 # May 2022
 from abc import ABC, abstractmethod
-from collections import UserList
+from collections.abc import MutableSequence
 
 
 class Problem(ABC):
@@ -11,17 +11,102 @@ class Problem(ABC):
         # rules: list of ProductionRule objects
         self.rules = rules
 
-    def search(self, Method, **kwargs):
+    @property
+    def rules(self):
+        # returns list of ProductionRule objects
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules):
+        # sets production rules, the compiled rules are discarded (see method compile_rules)
+        self._rules = rules
+        self._clear_compiled_rules()
+
+    def _clear_compiled_rules(self):
+        # discards the compiled rules, which are compiled again when needed
+        # called when the rules change, or when the problem changes in a way that affects the compiled rules
+        self._successor_function = None
+        self._compiled_rules = None  # tuple of the production rules that are compiled
+        self._rules_are_compiled = False
+
+    def check_compiled_rules(self):
+        # discards the compiled rules if the production rules were changed in place since they were compiled
+        #   (e.g. problem.rules.reverse()), as the rules setter is not called then
+        # called at the start of each search (see search.base.Algorithm)
+        if self._rules_are_compiled and tuple(self._rules) != self._compiled_rules:
+            self._clear_compiled_rules()
+
+    def compile_rules(self):
+        # compiles the production rules into a successor function, which is a fast path for State.get_successors
+        # a successor function takes a State object and returns a list of tuples (new state, cost),
+        #   one for each valid move, in the order of the production rules
+        #   i.e. the same result as applying the rules one by one, without creating Move objects
+        # to be implemented by subclasses, e.g. with tables computed at once for all states
+        # returns function, or None if the rules cannot be compiled (default)
+        return None
+
+    def get_successor_function(self):
+        # returns the compiled production rules (see method compile_rules), or None
+        # the rules are compiled once, the first time this method is called
+        if not self._rules_are_compiled:
+            self._compiled_rules = tuple(self._rules)
+            self._successor_function = self.compile_rules()
+            self._rules_are_compiled = True
+        return self._successor_function
+
+    def __getstate__(self):
+        # overrides inherited __getstate__ method, used by pickle and copy.deepcopy
+        # the compiled rules are left out, as functions cannot be pickled; they are compiled again when needed
+        state = self.__dict__.copy()
+        state['_successor_function'] = None
+        state['_compiled_rules'] = None
+        state['_rules_are_compiled'] = False
+        return state
+
+    def search(self, Method, cache=None, **kwargs):
         # searches path from start to goal
         # Method is a search.base.Algorithm class: DFS, BFS, NDS, IDS, HC, GS, BS, UC, OUC, BBUC, EEUC, AS
+        # cache is a cache.ResultCache object, default is None
+        #   if given, the result is looked up in the cache first and stored in the cache after searching
         # kwargs:
         # - print_result: boolean, default is True
         # - print_queue: boolean, default is False
         # - extra parameters to instantiate Method (e.g. width in case of beam search BS)
-        method = Method(self._get_initial_queue(), **kwargs)
+        if cache is not None:
+            return cache.search(self, Method, **kwargs)
+        method = self.create_algorithm(Method, **kwargs)
         method.search()
         return method.path_to_goal
 
+    async def search_async(self, Method, **kwargs):
+        # searches path from start to goal without blocking the asyncio event loop
+        # Method and kwargs: see method search (the cache is not supported)
+        # the search can be cancelled by cancelling the awaiting task (see search.base.Algorithm.search_async)
+        method = self.create_algorithm(Method, **kwargs)
+        return await method.search_async()
+
+    def create_algorithm(self, Method, **kwargs):
+        # creates search algorithm object to search path from start to goal
+        # Method and kwargs: see method search
+        # useful if the algorithm object must be kept, e.g. for incremental search (search.incremental.LPAS)
+        return Method(self._get_initial_queue(), **kwargs)
+
+    def apply_heuristic_batch(self, states):
+        # applies heuristic to all given states (list of State objects) at once
+        # returns list of floats, the same as calling apply_heuristic on each state
+        # subclasses can override this method to compute the heuristic in one vectorized call
+        return [state.apply_heuristic() for state in states]
+
+    def fingerprint(self):
+        # returns hash (string) of the content of problem self, used as key by cache.ResultCache
+        # to be implemented by subclasses that support caching
+        raise NotImplementedError(f"{type(self).__name__} does not implement fingerprint")
+
+    def _get_path(self, keys, cost=0.0):
+        # creates Path object from given state keys (see State.key) and accumulated cost
+        # to be implemented by subclasses that support caching
+        raise NotImplementedError(f"{type(self).__name__} does not implement _get_path")
+
     @abstractmethod
     def _get_initial_queue(self):
         pass
@@ -29,17 +114,40 @@ class Problem(ABC):
 
 class State(ABC):
     # abstract class to represent states of a search problem
+    # a search creates many states, so states have no instance dictionary (__slots__):
+    #   subclasses should also define __slots__ with their own attributes
+
+    __slots__ = ('problem',)
 
     def __init__(self, problem):
         # problem is Problem object
         self.problem = problem
-        self.rules = problem.rules
+
+    @property
+    def rules(self):
+        # returns the production rules of the problem (list of ProductionRule objects)
+        return self.problem.rules
 
     def apply_production_rules(self):
         # applies production rules self.rules to state self
         # returns list of Move objects
         return [rule.apply(self) for rule in self.rules]
 
+    def get_successors(self):
+        # returns list of tuples (new state, cost) for all valid moves from state self
+        # uses the compiled production rules of the problem if available (see Problem.compile_rules)
+        successors = self.problem.get_successor_function()
+        if successors is not None:
+            return successors(self)
+        return [(move.apply(), move.cost) for move in self.apply_production_rules() if move.is_valid()]
+
+    @property
+    def key(self):
+        # returns a compact, hashable and picklable value that identifies state self within its problem
+        # e.g. the coordinate of a maze cell
+        # to be implemented by subclasses that support caching
+        raise NotImplementedError(f"{type(self).__name__} does not implement key")
+
     @abstractmethod
     def is_valid_move(self, move):
         # checks if given move is valid
@@ -92,6 +200,8 @@ class Move:
     # class that implements a move
     # a move is a production rule that is applied to a given state
 
+    __slots__ = ('state', 'rule', 'cost')
+
     def __init__(self, state, rule, cost=0.0):
         # state is a State object
         # rule is a ProductionRule object
@@ -111,15 +221,111 @@ class Move:
         return self.state.apply_move(self)
 
 
-class Path(UserList):
+class SlottedList(MutableSequence):
+    # list wrapper that behaves like collections.UserList
+    # but without instance dictionary (__slots__), which saves memory as a search creates many paths
+
+    __slots__ = ('data',)
+
+    def __init__(self, items=None):
+        # items is iterable, default is None (empty list)
+        self.data = [] if items is None else list(items.data if isinstance(items, SlottedList) else items)
+
+    def __lt__(self, other):
+        return self.data < self.__cast(other)
+
+    def __le__(self, other):
+        return self.data <= self.__cast(other)
+
+    def __eq__(self, other):
+        return self.data == self.__cast(other)
+
+    def __gt__(self, other):
+        return self.data > self.__cast(other)
+
+    def __ge__(self, other):
+        return self.data >= self.__cast(other)
+
+    __hash__ = None  # mutable, so not hashable
+
+    @staticmethod
+    def __cast(other):
+        return other.data if isinstance(other, SlottedList) else other
+
+    def __contains__(self, item):
+        return item in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.__class__(self.data[i])
+        else:
+            return self.data[i]
+
+    def __setitem__(self, i, item):
+        self.data[i] = item
+
+    def __delitem__(self, i):
+        del self.data[i]
+
+    def __add__(self, other):
+        return self.__class__(self.data + (other.data if isinstance(other, SlottedList) else list(other)))
+
+    def __radd__(self, other):
+        return self.__class__((other.data if isinstance(other, SlottedList) else list(other)) + self.data)
+
+    def __iadd__(self, other):
+        self.data += other.data if isinstance(other, SlottedList) else list(other)
+        return self
+
+    def append(self, item):
+        self.data.append(item)
+
+    def insert(self, i, item):
+        self.data.insert(i, item)
+
+    def pop(self, i=-1):
+        return self.data.pop(i)
+
+    def remove(self, item):
+        self.data.remove(item)
+
+    def clear(self):
+        self.data.clear()
+
+    def count(self, item):
+        return self.data.count(item)
+
+    def index(self, item, *args):
+        return self.data.index(item, *args)
+
+    def reverse(self):
+        self.data.reverse()
+
+    def sort(self, *args, **kwargs):
+        self.data.sort(*args, **kwargs)
+
+    def extend(self, other):
+        self.data.extend(other.data if isinstance(other, SlottedList) else other)
+
+
+class Path(SlottedList):
     # class to implement a path
     # a path is a series of states
 
+    __slots__ = ('cost', 'heuristic')
+
     def __init__(self, states, cost=0.0):
         # states is a list of State objects
         # cost is the accumulated cost of the path (float)
         super().__init__(states)
         self.cost = cost
+        self.heuristic = None  # heuristic of last state, stored by search algorithms (see search.base)
 
     def has_loop(self):
         # checks if path self contains cycles/loops
@@ -142,14 +348,26 @@ class Path(UserList):
     def calculate_children(self):
         # generates children of last state in path self
         # returns list containing these child paths
-        moves = self[-1].apply_production_rules()  # apply production rules on last state
-        return [self.__apply_move(move) for move in moves if move.is_valid()]  # apply moves if they are valid
-
-    def __apply_move(self, move):
-        # applies given move and adds resulting new state to path self
-        # returns new Path object
-        new_path = self + type(self)([move.apply()])
-        new_path.cost = self.cost + move.cost
+        return list(self.generate_children())
+
+    def generate_children(self):
+        # generates children of last state in path self one by one
+        # yields child paths in the order of the production rules
+        # uses the compiled production rules of the problem if available (see Problem.compile_rules)
+        successors = self[-1].problem.get_successor_function()
+        if successors is not None:
+            for state, cost in successors(self[-1]):
+                yield self.create_child(state, cost)
+            return
+        for move in self[-1].apply_production_rules():  # apply production rules on last state
+            if move.is_valid():
+                yield self.create_child(move.apply(), move.cost)  # apply moves if they are valid
+
+    def create_child(self, state, cost):
+        # adds given new state to path self, reached by a move with given cost
+        # returns new Path object, path self is not changed
+        new_path = type(self)(self.data + [state])
+        new_path.cost = self.cost + cost
         return new_path
 
     def string_to_print(self, attr=None, ndigits=1):
@@ -177,10 +395,12 @@ class Path(UserList):
         return f"[{states}]"
 
 
-class PathSeries(UserList):
+class PathSeries(SlottedList):
     # class to implement a series of paths
     # e.g. the queue in search algorithms
 
+    __slots__ = ()
+
     def __init__(self, paths):
         # paths is list of Path objects
         super().__init__(paths)
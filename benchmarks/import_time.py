@@ -0,0 +1,64 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+#
+# benchmark: time and memory needed to import SearchExerciser modules
+# run from the repository root: python benchmarks/import_time.py
+# exits with status 1 if a module imports one of the heavy optional packages
+# (matplotlib, IPython, networkx), which must only be imported when plotting or building graphs
+import os
+import subprocess
+import sys
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # directory containing package SearchExerciser
+MODULES = ["SearchExerciser.maze", "SearchExerciser.graph", "SearchExerciser.search.optimal"]
+HEAVY = ["matplotlib", "IPython", "networkx"]
+REPEAT = 5
+
+TIME_CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, ",".join(name for name in {heavy} if name in sys.modules))
+"""
+
+MEMORY_CODE = """
+import tracemalloc
+tracemalloc.start()
+import {module}
+print(tracemalloc.get_traced_memory()[1])
+"""
+
+
+def run(code, module):
+    # runs code for given module in a new interpreter
+    # returns printed output (string)
+    code = code.format(module=module, heavy=HEAVY)
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+
+def measure(module):
+    # imports module in a new interpreter
+    # returns import time (seconds), peak memory allocated during import (bytes), list of heavy packages imported
+    # memory is measured in a separate run, as tracing memory allocations slows down the import
+    elapsed, heavy = run(TIME_CODE, module).split(" ")
+    memory = run(MEMORY_CODE, module)
+    return float(elapsed), int(memory), [name for name in heavy.strip().split(",") if name]
+
+
+def main():
+    failed = False
+    print(f"{'module':35s}{'time (ms)':>12s}{'memory (MB)':>14s}  heavy imports")
+    for module in MODULES:
+        results = [measure(module) for _ in range(REPEAT)]
+        elapsed = median([result[0] for result in results])
+        memory = median([result[1] for result in results])
+        heavy = results[0][2]
+        failed = failed or len(heavy) > 0
+        print(f"{module:35s}{1000 * elapsed:12.1f}{memory / 1e6:14.2f}  {', '.join(heavy) or '-'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
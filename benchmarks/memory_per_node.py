@@ -0,0 +1,68 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+#
+# benchmark: memory needed per path in the queue (frontier) of a breadth-first search
+# run from the repository root: python benchmarks/memory_per_node.py
+# each path in the frontier adds one new state to the path it is created from,
+# so the reported bytes per path include the path object, its list of states, and the new state
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SearchExerciser.maze import Maze, Position, State as MazeState, Move as MazeMove, Left  # noqa: E402
+from SearchExerciser.graph import Graph  # noqa: E402
+
+
+def create_frontier(problem, num_of_paths):
+    # expands paths breadth-first until the frontier contains num_of_paths paths
+    # returns the frontier (list of Path objects)
+    frontier = list(problem._get_initial_queue())
+    while len(frontier) < num_of_paths:
+        path = frontier.pop(0)
+        frontier.extend(child for child in path.calculate_children() if not child.has_loop())
+    return frontier
+
+
+def measure(problem, num_of_paths):
+    # returns traced bytes per path in a frontier of num_of_paths paths
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    frontier = create_frontier(problem, num_of_paths)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(frontier)
+
+
+def object_size(obj):
+    # returns size of obj in bytes, including its instance dictionary if it has one
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main():
+    maze = Maze(grid=[[0] + [1] * 299] + [[1] * 300 for _ in range(298)] + [[1] * 299 + [3]])
+    edges = [(f"{i},{j}", f"{i},{j + 1}") for i in range(20) for j in range(19)]
+    edges += [(f"{i},{j}", f"{i + 1},{j}") for i in range(19) for j in range(20)]
+    graph = Graph.create(edges, start="0,0", goal="19,19")
+    state = MazeState(maze, Position(0, 0))
+    path = maze._get_initial_queue()[0]
+    print("object sizes (bytes):")
+    print(f"  maze Position: {object_size(state.position)}")
+    print(f"  maze State:    {object_size(state)}")
+    print(f"  maze Move:     {object_size(MazeMove(state, Left(), 1.0))}")
+    print(f"  maze Path:     {object_size(path)} + list of states {sys.getsizeof(path.data)}")
+    print("bytes per path in BFS frontier:")
+    print(f"  maze (50000 paths):  {measure(maze, 50000):.0f}")
+    print(f"  graph (5000 paths):  {measure(graph, 5000):.0f}")
+
+
+if __name__ == "__main__":
+    main()
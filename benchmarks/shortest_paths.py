@@ -0,0 +1,50 @@
+# SearchExerciser is developed by Stefaan Haspeslagh and Andy Louwyck
+# at Vives University of Applied Sciences, Kortrijk, Belgium.
+# May 2022
+#
+# benchmark: throughput of many-to-many shortest path queries on a graph
+# run from the repository root: python benchmarks/shortest_paths.py
+# compares Graph.shortest_paths, which reuses one shortest path tree per distinct start vertex,
+# with a separate Dijkstra search for each (start, goal) pair
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SearchExerciser.graph import Graph  # noqa: E402
+
+
+def per_pair(graph, pairs):
+    # returns list with the cost of the shortest path for each pair, one Dijkstra search per pair
+    costs = []
+    for start, goal in pairs:
+        distance, _ = graph._dijkstra_tree(start, {goal})
+        costs.append(distance.get(goal))
+    return costs
+
+
+def main(num_of_layers=100, layer_size=200, num_of_starts=10, goals_per_start=50, seed=0):
+    graph = Graph.create_random_large([layer_size] * num_of_layers, max_num_of_edges=3 * layer_size, seed=seed)
+    rng = random.Random(seed)
+    vertices = list(graph.csr.vertices)
+    starts = rng.sample(vertices, num_of_starts)
+    pairs = [(start, goal) for start in starts for goal in rng.sample(vertices, goals_per_start)]
+    print(f"graph with {len(graph.csr.vertices)} vertices and {graph.csr.number_of_edges()} edges")
+    print(f"{len(pairs)} pairs, {num_of_starts} distinct start vertices")
+
+    t = perf_counter()
+    paths = graph.shortest_paths(pairs)
+    batched = perf_counter() - t
+    t = perf_counter()
+    costs = per_pair(graph, pairs)
+    separate = perf_counter() - t
+
+    assert [None if path is None else path.cost for path in paths] == costs
+    print(f"  shortest_paths: {batched:.2f} s ({len(pairs) / batched:.0f} pairs/s)")
+    print(f"  per pair:       {separate:.2f} s ({len(pairs) / separate:.0f} pairs/s)")
+
+
+if __name__ == "__main__":
+    main()